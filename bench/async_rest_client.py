@@ -0,0 +1,75 @@
+"""
+Throughput of signed create_order calls against a local stub server that holds
+each request for 5 ms, issued one at a time through PacificaRestClient and
+concurrently through AsyncPacificaRestClient at several in-flight limits and
+connection pool sizes.
+
+python3 -m bench.async_rest_client
+"""
+
+import asyncio
+import time
+
+from solders.keypair import Keypair
+
+from bench.payloads import order_payload
+from bench.stub import start_stub_server
+from common.async_rest_client import AsyncPacificaRestClient
+from common.rest_client import PacificaRestClient
+
+
+REQUESTS = 1_000
+# Simulated network and server time per request
+LATENCY = 0.005
+
+
+async def run_async(keypair, base_url, max_in_flight, max_connections):
+    async with AsyncPacificaRestClient(
+        keypair,
+        base_url=base_url,
+        max_in_flight=max_in_flight,
+        max_connections=max_connections,
+    ) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.create_order(order_payload()) for _ in range(REQUESTS))
+        )
+        elapsed = time.perf_counter() - start
+    assert all(response.status_code == 200 for response in responses)
+    return elapsed
+
+
+def main():
+    server, base_url = start_stub_server(latency=LATENCY)
+    keypair = Keypair()
+
+    with PacificaRestClient(keypair, base_url=base_url) as client:
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            client.create_order(order_payload())
+        elapsed = time.perf_counter() - start
+    print(f"{'client':<8}{'in flight':>10}{'connections':>13}{'req/s':>10}")
+    print(f"{'sync':<8}{1:>10}{1:>13}{REQUESTS / elapsed:>10.0f}")
+
+    for max_in_flight, max_connections in (
+        (1, 1),
+        (8, 8),
+        (16, 16),
+        (32, 32),
+        (64, 64),
+        (64, 16),
+        (256, 16),
+    ):
+        elapsed = asyncio.run(
+            run_async(keypair, base_url, max_in_flight, max_connections)
+        )
+        print(
+            f"{'async':<8}{max_in_flight:>10}{max_connections:>13}"
+            f"{REQUESTS / elapsed:>10.0f}"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
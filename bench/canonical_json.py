@@ -0,0 +1,48 @@
+"""
+Compares the canonical JSON encoder used by prepare_message_bytes with the previous
+sort_json_keys + json.dumps + encode path.
+
+python3 -m bench.canonical_json
+"""
+
+import json
+import time
+import timeit
+
+from bench.payloads import shapes
+from common.utils import encode_canonical, sort_json_keys
+
+
+ITERATIONS = 20_000
+
+
+def legacy_encode(value):
+    message = sort_json_keys(value)
+    message = json.dumps(message, separators=(",", ":"))
+    return message.encode("utf-8")
+
+
+def main():
+    timestamp = int(time.time() * 1_000)
+
+    print(f"{'shape':<8}{'legacy us':>12}{'canonical us':>14}{'speedup':>10}")
+    for name, header, payload in shapes(timestamp):
+        data = {**header, "data": payload}
+
+        # The new path must be a drop-in replacement for what the server verifies.
+        assert encode_canonical(data) == legacy_encode(data), name
+
+        iterations = ITERATIONS if name != "batch" else ITERATIONS // 50
+        legacy = timeit.timeit(lambda: legacy_encode(data), number=iterations)
+        canonical = timeit.timeit(lambda: encode_canonical(data), number=iterations)
+
+        print(
+            f"{name:<8}"
+            f"{legacy / iterations * 1e6:>12.2f}"
+            f"{canonical / iterations * 1e6:>14.2f}"
+            f"{legacy / canonical:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,619 @@
+"""
+Local stand-in for the Pacifica REST and WebSocket APIs, for offline benchmarks
+and load tests.
+
+The REST server answers the same routes as the SDK clients use (/orders/create,
+/orders/batch, /orders/twap, /positions/tpsl, /account/..., /agent/...) under
+/api/v1. The WebSocket server speaks the {"id", "params": {type: request}} order
+protocol and the {"method": "subscribe", "params": {...}} subscription protocol.
+Both share one in-memory order book per account.
+
+Every signed request is checked the way the exchange checks it: the signature
+must verify against the account (or agent wallet) for the canonical message, and
+the timestamp must still be inside its expiry window. Latency is added to every
+reply, and a token bucket per account (or per PF-API-KEY) answers 429 with
+Retry-After and X-RateLimit-* headers once it runs dry.
+
+    exchange = start_exchange(latency=0.002, rate_limit=(50, 100))
+    client = PacificaRestClient(keypair, base_url=exchange.rest_url)
+    ...
+    exchange.close()
+
+Run standalone and point REST_URL / WS_URL in common/constants.py at it:
+
+python3 -m bench.exchange --port 8080 --ws-port 8081 --latency 0.002
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from websockets.asyncio.server import serve
+
+from common.rate_limit import TokenBucket
+from common.rest_client import (
+    API_KEY_HEADER,
+    BATCH_PATH,
+    CREATE_SUBACCOUNT_PATH,
+    ENDPOINTS,
+    OPEN_TWAP_ORDERS_PATH,
+    TWAP_ORDER_HISTORY_BY_ID_PATH,
+    TWAP_ORDER_HISTORY_PATH,
+)
+from common.utils import BATCH_ACTION_TYPES, prepare_message_bytes
+
+
+API_PREFIX = "/api/v1"
+
+# Path -> signature type, the inverse of the client's table
+SIGNED_PATHS = {path: message_type for message_type, path in ENDPOINTS.items()}
+BATCH_MESSAGE_TYPES = {
+    action: message_type for message_type, action in BATCH_ACTION_TYPES.items()
+}
+
+# Request fields that belong to the signature header rather than the payload
+HEADER_FIELDS = ("account", "agent_wallet", "signature", "timestamp", "expiry_window")
+
+# Seconds between two pushes on the "prices" channel
+PRICE_INTERVAL = 0.1
+PRICE_SYMBOLS = ("BTC", "ETH", "SOL")
+
+
+class RequestError(Exception):
+    def __init__(self, message, code=400, retry_after=None):
+        super().__init__(message)
+        self.code = code
+        self.retry_after = retry_after
+
+
+def verify_signature(signer, signature, message_bytes):
+    try:
+        return Signature.from_string(signature).verify(
+            Pubkey.from_string(signer), message_bytes
+        )
+    except ValueError:
+        return False
+
+
+class StandInExchange:
+    def __init__(self, latency=0, rate_limit=None, verify=True):
+        # rate_limit: (requests per second, burst) per account, None disables it
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.verify = verify
+
+        self._lock = threading.Lock()
+        self._order_ids = itertools.count(1)
+        self._orders = {}  # account -> {order_id: order}
+        self._twap_orders = {}  # account -> {order_id: order}
+        self._twap_history = {}  # account -> [order]
+        self._buckets = {}
+        self._listeners = []  # callables taking (account, source, data)
+        self.counts = {}
+
+        self._handlers = {
+            "create_order": self._create_order,
+            "create_market_order": self._create_order,
+            "cancel_order": self._cancel_order,
+            "cancel_all_orders": self._cancel_all_orders,
+            "create_twap_order": self._create_twap_order,
+            "cancel_twap_order": self._cancel_twap_order,
+        }
+
+    # ---------------------------------------------------------------
+    # Checks
+    # ---------------------------------------------------------------
+
+    def check_rate_limit(self, key):
+        if self.rate_limit is None:
+            return None
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(*self.rate_limit)
+            wait = bucket.wait_time()
+            if wait > 0:
+                raise RequestError("Rate limit exceeded", 429, retry_after=wait)
+            bucket.consume()
+            return bucket
+
+    def check_signed(self, message_type, request):
+        try:
+            header = {
+                "timestamp": request["timestamp"],
+                "expiry_window": request["expiry_window"],
+                "type": message_type,
+            }
+            signer = request.get("agent_wallet") or request["account"]
+            signature = request["signature"]
+        except (KeyError, TypeError):
+            raise RequestError("Missing signature header fields")
+
+        now = int(time.time() * 1_000)
+        if now > header["timestamp"] + header["expiry_window"]:
+            raise RequestError("Request expired")
+
+        if self.verify:
+            payload = {k: v for k, v in request.items() if k not in HEADER_FIELDS}
+            message_bytes = prepare_message_bytes(header, payload)
+            if not verify_signature(signer, signature, message_bytes):
+                raise RequestError("Invalid signature")
+
+    # ---------------------------------------------------------------
+    # Requests
+    # ---------------------------------------------------------------
+
+    def handle_signed(self, message_type, request):
+        self.check_signed(message_type, request)
+        handler = self._handlers.get(message_type)
+        with self._lock:
+            self.counts[message_type] = self.counts.get(message_type, 0) + 1
+            data = handler(request) if handler is not None else None
+        if handler is not None:
+            self._notify(request["account"], message_type, data)
+        return data
+
+    def handle_batch(self, request):
+        results = []
+        for action in request.get("actions", []):
+            message_type = BATCH_MESSAGE_TYPES.get(action.get("type"))
+            try:
+                if message_type is None:
+                    raise RequestError(f"Unsupported action type: {action.get('type')}")
+                data = self.handle_signed(message_type, action.get("data") or {})
+                results.append({"success": True, "data": data, "error": None})
+            except RequestError as e:
+                results.append({"success": False, "data": None, "error": str(e)})
+        return {"results": results}
+
+    def handle_create_subaccount(self, request):
+        try:
+            main_account = request["main_account"]
+            subaccount = request["subaccount"]
+            header = {
+                "timestamp": request["timestamp"],
+                "expiry_window": request["expiry_window"],
+            }
+            sub_signature = request["sub_signature"]
+            main_signature = request["main_signature"]
+        except KeyError:
+            raise RequestError("Missing subaccount fields")
+
+        if self.verify:
+            sub_message = prepare_message_bytes(
+                {**header, "type": "subaccount_initiate"}, {"account": main_account}
+            )
+            main_message = prepare_message_bytes(
+                {**header, "type": "subaccount_confirm"}, {"signature": sub_signature}
+            )
+            if not (
+                verify_signature(subaccount, sub_signature, sub_message)
+                and verify_signature(main_account, main_signature, main_message)
+            ):
+                raise RequestError("Invalid signature")
+        return None
+
+    def open_twap_orders(self, account):
+        with self._lock:
+            return list(self._twap_orders.get(account, {}).values())
+
+    def twap_order_history(self, account=None, order_id=None):
+        with self._lock:
+            if account is not None:
+                return list(self._twap_history.get(account, []))
+            return [
+                order
+                for history in self._twap_history.values()
+                for order in history
+                if order["order_id"] == order_id
+            ]
+
+    def open_orders(self, account):
+        with self._lock:
+            return list(self._orders.get(account, {}).values())
+
+    # Called with the lock held
+
+    def _new_order(self, request):
+        order = {k: v for k, v in request.items() if k not in HEADER_FIELDS}
+        order["order_id"] = next(self._order_ids)
+        order["account"] = request["account"]
+        order["created_at"] = int(time.time() * 1_000)
+        return order
+
+    def _create_order(self, request):
+        order = self._new_order(request)
+        self._orders.setdefault(request["account"], {})[order["order_id"]] = order
+        return {"order_id": order["order_id"]}
+
+    def _cancel_order(self, request):
+        orders = self._orders.get(request["account"], {})
+        order_id = request.get("order_id")
+        if order_id is None:
+            client_order_id = request.get("client_order_id")
+            for order in orders.values():
+                if order.get("client_order_id") == client_order_id:
+                    order_id = order["order_id"]
+                    break
+        if orders.pop(order_id, None) is None:
+            raise RequestError("Order not found")
+        return {"order_id": order_id}
+
+    def _cancel_all_orders(self, request):
+        orders = self._orders.get(request["account"], {})
+        if request.get("all_symbols", True):
+            cancelled = list(orders)
+        else:
+            symbol = request.get("symbol")
+            cancelled = [i for i, o in orders.items() if o.get("symbol") == symbol]
+        for order_id in cancelled:
+            del orders[order_id]
+        return {"cancelled_count": len(cancelled)}
+
+    def _create_twap_order(self, request):
+        order = self._new_order(request)
+        self._twap_orders.setdefault(request["account"], {})[order["order_id"]] = order
+        self._twap_history.setdefault(request["account"], []).append(order)
+        return {"order_id": order["order_id"]}
+
+    def _cancel_twap_order(self, request):
+        orders = self._twap_orders.get(request["account"], {})
+        if orders.pop(request.get("order_id"), None) is None:
+            raise RequestError("TWAP order not found")
+        return {"order_id": request.get("order_id")}
+
+    # ---------------------------------------------------------------
+    # Account updates
+    # ---------------------------------------------------------------
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def _notify(self, account, message_type, data):
+        if "twap" in message_type:
+            sources = ("account_twap_orders", "account_twap_order_updates")
+        else:
+            sources = ("account_order_updates",)
+        for listener in self._listeners:
+            for source in sources:
+                listener(
+                    account,
+                    source,
+                    {"type": message_type, "u": account, **(data or {})},
+                )
+
+
+def success(data):
+    return {"success": True, "data": data, "error": None, "code": None}
+
+
+def failure(error):
+    return {"success": False, "data": None, "error": str(error), "code": error.code}
+
+
+# -------------------------------------------------------------------
+# REST
+# -------------------------------------------------------------------
+
+
+class ExchangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self, status, body, headers=()):
+        if self.server.exchange.latency:
+            time.sleep(self.server.exchange.latency)
+        encoded = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _route(self, method):
+        exchange = self.server.exchange
+        url = urlsplit(self.path)
+        path = url.path
+        if path.startswith(API_PREFIX):
+            path = path[len(API_PREFIX) :]
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        headers = []
+        try:
+            request = json.loads(body) if body else {}
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            key = self.headers.get(API_KEY_HEADER) or request.get(
+                "account", self.client_address[0]
+            )
+            bucket = exchange.check_rate_limit(key)
+            if bucket is not None:
+                headers.append(("X-RateLimit-Limit", str(int(bucket.capacity))))
+                headers.append(("X-RateLimit-Remaining", str(int(bucket.tokens))))
+
+            if method == "GET":
+                data = self._get(exchange, path, params)
+            elif path == BATCH_PATH:
+                data = exchange.handle_batch(request)
+            elif path == CREATE_SUBACCOUNT_PATH:
+                data = exchange.handle_create_subaccount(request)
+            elif path in SIGNED_PATHS:
+                data = exchange.handle_signed(SIGNED_PATHS[path], request)
+            else:
+                raise RequestError(f"Unknown endpoint: {path}", 404)
+        except ValueError:
+            return self._reply(400, failure(RequestError("Invalid JSON")), headers)
+        except RequestError as e:
+            if e.retry_after is not None:
+                limit = int(exchange.rate_limit[1])
+                headers.append(("X-RateLimit-Limit", str(limit)))
+                headers.append(("X-RateLimit-Remaining", "0"))
+                headers.append(("Retry-After", f"{e.retry_after:.3f}"))
+            return self._reply(e.code, failure(e), headers)
+        self._reply(200, success(data), headers)
+
+    def _get(self, exchange, path, params):
+        if path == OPEN_TWAP_ORDERS_PATH:
+            return exchange.open_twap_orders(params.get("account"))
+        if path == TWAP_ORDER_HISTORY_PATH:
+            return exchange.twap_order_history(account=params.get("account"))
+        if path == TWAP_ORDER_HISTORY_BY_ID_PATH:
+            return exchange.twap_order_history(order_id=int(params.get("order_id", 0)))
+        if path == "/orders":
+            return exchange.open_orders(params.get("account"))
+        raise RequestError(f"Unknown endpoint: {path}", 404)
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_GET(self):
+        self._route("GET")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ExchangeHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+
+# -------------------------------------------------------------------
+# WebSocket
+# -------------------------------------------------------------------
+
+
+class WsConnection:
+    # Replies go through an outbox drained by one task, so the added latency
+    # delays every reply by the same amount without reordering them.
+
+    def __init__(self, websocket, latency):
+        self.websocket = websocket
+        self.latency = latency
+        self.subscriptions = set()  # (source, account or None)
+        self.outbox = asyncio.Queue()
+        self.sender = asyncio.create_task(self._drain())
+
+    def send(self, message):
+        loop = asyncio.get_running_loop()
+        self.outbox.put_nowait((loop.time() + self.latency, json.dumps(message)))
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            due, text = await self.outbox.get()
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.websocket.send(text)
+            except Exception:
+                return
+
+
+class WsExchangeServer:
+    def __init__(self, exchange, host, port):
+        self.exchange = exchange
+        self.host = host
+        self.port = port
+        self.connections = set()
+        self.loop = None
+        self.server = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self._serve())
+
+    async def _serve(self):
+        self.exchange.add_listener(self._on_account_update)
+        async with serve(self._handle, self.host, self.port) as server:
+            self.server = server
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            prices = asyncio.create_task(self._publish_prices())
+            await server.wait_closed()
+            prices.cancel()
+
+    async def _handle(self, websocket):
+        connection = WsConnection(websocket, self.exchange.latency)
+        self.connections.add(connection)
+        try:
+            async for text in websocket:
+                self._on_message(connection, text)
+        except Exception:
+            pass
+        finally:
+            self.connections.discard(connection)
+            connection.sender.cancel()
+
+    def _on_message(self, connection, text):
+        try:
+            message = json.loads(text)
+        except ValueError:
+            connection.send({"code": 400, "err": "Invalid JSON"})
+            return
+
+        method = message.get("method")
+        if method == "ping":
+            connection.send({"channel": "pong"})
+            return
+        if method in ("subscribe", "unsubscribe"):
+            params = message.get("params") or {}
+            subscription = (params.get("source"), params.get("account"))
+            if method == "subscribe":
+                connection.subscriptions.add(subscription)
+            else:
+                connection.subscriptions.discard(subscription)
+            connection.send({"channel": method, "data": params})
+            return
+
+        request_id = message.get("id")
+        params = message.get("params") or {}
+        for message_type, request in params.items():
+            reply = {
+                "id": request_id,
+                "t": int(time.time() * 1_000),
+                "type": message_type,
+            }
+            try:
+                self.exchange.check_rate_limit(request.get("account"))
+                if message_type not in ENDPOINTS:
+                    raise RequestError(f"Unknown request type: {message_type}")
+                reply["data"] = self.exchange.handle_signed(message_type, request)
+                reply["code"] = 200
+            except RequestError as e:
+                reply["code"] = e.code
+                reply["err"] = str(e)
+            connection.send(reply)
+
+    def _on_account_update(self, account, source, data):
+        # Called from whichever thread handled the request
+        self.loop.call_soon_threadsafe(self._publish, (source, account), data)
+
+    def _publish(self, subscription, data):
+        message = {"channel": subscription[0], "data": data}
+        for connection in list(self.connections):
+            if subscription in connection.subscriptions:
+                connection.send(message)
+
+    async def _publish_prices(self):
+        ticks = itertools.count()
+        while True:
+            await asyncio.sleep(PRICE_INTERVAL)
+            tick = next(ticks)
+            data = [
+                {
+                    "symbol": symbol,
+                    "mark": str(100_000 / (i + 1) + tick % 100),
+                    "timestamp": int(time.time() * 1_000),
+                }
+                for i, symbol in enumerate(PRICE_SYMBOLS)
+            ]
+            self._publish(("prices", None), data)
+
+    def drop_connections(self):
+        # Abort every client socket without a close handshake, as a network failure
+        # would, to exercise reconnect handling
+        async def abort_all():
+            for connection in list(self.connections):
+                connection.websocket.transport.abort()
+
+        asyncio.run_coroutine_threadsafe(abort_all(), self.loop).result()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.server.close)
+        self._thread.join()
+
+
+class ExchangeHandle:
+    def __init__(self, exchange, http_server, ws_server, host):
+        self.exchange = exchange
+        self.http_server = http_server
+        self.ws_server = ws_server
+        self.rest_url = f"http://{host}:{http_server.server_address[1]}{API_PREFIX}"
+        self.ws_url = f"ws://{host}:{ws_server.port}/ws"
+
+    def drop_connections(self):
+        self.ws_server.drop_connections()
+
+    def close(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        self.ws_server.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def start_exchange(
+    host="127.0.0.1", port=0, ws_port=0, latency=0, rate_limit=None, verify=True
+):
+    exchange = StandInExchange(latency=latency, rate_limit=rate_limit, verify=verify)
+
+    http_server = ExchangeHTTPServer((host, port), ExchangeHandler)
+    http_server.exchange = exchange
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+
+    ws_server = WsExchangeServer(exchange, host, ws_port).start()
+    return ExchangeHandle(exchange, http_server, ws_server, host)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="REST port")
+    parser.add_argument("--ws-port", type=int, default=8081, help="WebSocket port")
+    parser.add_argument(
+        "--latency", type=float, default=0, help="seconds added to every reply"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="requests per second allowed per account (default: unlimited)",
+    )
+    parser.add_argument("--burst", type=int, help="bucket capacity (default: 2x rate)")
+    parser.add_argument(
+        "--no-verify", action="store_true", help="skip signature verification"
+    )
+    args = parser.parse_args()
+
+    rate_limit = None
+    if args.rate:
+        rate_limit = (args.rate, args.burst or int(args.rate * 2))
+
+    handle = start_exchange(
+        args.host,
+        args.port,
+        args.ws_port,
+        latency=args.latency,
+        rate_limit=rate_limit,
+        verify=not args.no_verify,
+    )
+    print(f"REST_URL = {handle.rest_url!r}")
+    print(f"WS_URL = {handle.ws_url!r}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        handle.close()
+
+
+if __name__ == "__main__":
+    main()
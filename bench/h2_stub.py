@@ -0,0 +1,82 @@
+"""
+Minimal local cleartext HTTP/2 endpoint (prior knowledge, no TLS) for transport
+benchmarks. Every request is answered with the same JSON body as bench.stub,
+optionally after a fixed delay, and streams are served concurrently.
+"""
+
+import asyncio
+import threading
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+
+from bench.stub import RESPONSE_BODY
+
+
+class H2StubProtocol(asyncio.Protocol):
+    def __init__(self, latency):
+        self.latency = latency
+        self.connection = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False)
+        )
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.connection.initiate_connection()
+        transport.write(self.connection.data_to_send())
+
+    def data_received(self, data):
+        try:
+            events = self.connection.receive_data(data)
+        except h2.exceptions.ProtocolError:
+            self.transport.write(self.connection.data_to_send())
+            self.transport.close()
+            return
+
+        for event in events:
+            if isinstance(event, h2.events.DataReceived):
+                self.connection.acknowledge_received_data(
+                    event.flow_controlled_length, event.stream_id
+                )
+            elif isinstance(event, h2.events.StreamEnded):
+                asyncio.get_running_loop().create_task(self._reply(event.stream_id))
+        self.transport.write(self.connection.data_to_send())
+
+    async def _reply(self, stream_id):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.transport.is_closing():
+            return
+        self.connection.send_headers(
+            stream_id,
+            [
+                (":status", "200"),
+                ("content-type", "application/json"),
+                ("content-length", str(len(RESPONSE_BODY))),
+            ],
+        )
+        self.connection.send_data(stream_id, RESPONSE_BODY, end_stream=True)
+        self.transport.write(self.connection.data_to_send())
+
+
+def start_h2_stub_server(host="127.0.0.1", port=0, latency=0):
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        server = loop.run_until_complete(
+            loop.create_server(lambda: H2StubProtocol(latency), host, port)
+        )
+        holder["server"] = server
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    server = holder["server"]
+    return server, f"http://{host}:{server.sockets[0].getsockname()[1]}"
@@ -0,0 +1,61 @@
+"""
+Throughput of concurrent signed create_order calls through AsyncPacificaRestClient
+over HTTP/1.1 (a connection per in-flight request) and over a single multiplexed
+HTTP/2 connection, against local stubs that hold each request for 5 ms.
+
+python3 -m bench.http2
+"""
+
+import asyncio
+import time
+
+from solders.keypair import Keypair
+
+from bench.h2_stub import start_h2_stub_server
+from bench.payloads import order_payload
+from bench.stub import start_stub_server
+from common.async_rest_client import AsyncPacificaRestClient
+from common.rest_client import http_headers
+from common.transport import AsyncHttpxTransport
+
+
+REQUESTS = 1_000
+LATENCY = 0.005
+
+
+async def run(keypair, base_url, max_in_flight, http2):
+    transport = AsyncHttpxTransport(
+        http_headers(), http2=http2, max_connections=max_in_flight, prior_knowledge=True
+    )
+    async with AsyncPacificaRestClient(
+        keypair, base_url=base_url, max_in_flight=max_in_flight, transport=transport
+    ) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.create_order(order_payload()) for _ in range(REQUESTS))
+        )
+        elapsed = time.perf_counter() - start
+
+    assert all(response.status_code == 200 for response in responses)
+    assert responses[0].http_version == ("HTTP/2" if http2 else "HTTP/1.1")
+    return elapsed
+
+
+def main():
+    _, http1_url = start_stub_server(latency=LATENCY)
+    _, http2_url = start_h2_stub_server(latency=LATENCY)
+    keypair = Keypair()
+
+    print(f"{'in flight':<12}{'HTTP/1.1 req/s':>16}{'HTTP/2 req/s':>16}")
+    for max_in_flight in (1, 16, 64):
+        http1 = asyncio.run(run(keypair, http1_url, max_in_flight, http2=False))
+        http2 = asyncio.run(run(keypair, http2_url, max_in_flight, http2=True))
+        print(
+            f"{max_in_flight:<12}"
+            f"{REQUESTS / http1:>16.0f}"
+            f"{REQUESTS / http2:>16.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
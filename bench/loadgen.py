@@ -0,0 +1,321 @@
+"""
+Load generator that drives the SDK at a target request rate.
+
+A scenario is a weighted mix of actions (create_order, create_market_order,
+cancel_order, batch_orders) read from a JSONL file, one step per line:
+
+    {"action": "create_order", "weight": 6, "payload": {"symbol": "ETH"}}
+    {"action": "batch_orders", "weight": 1, "size": 4}
+
+Requests go out through AsyncPacificaRestClient, one client per keypair, so the
+numbers include the SDK's real signing, serialization and transport. Arrivals are
+open-loop at --rate: a request that cannot start on time because --concurrency
+requests are already in flight waits, and its latency is measured from when it
+was due, not from when it was sent. Cancels target orders this run created with
+the same key; with none open, the step creates an order instead.
+
+Run against the local stand-in exchange, or any REST endpoint with --url:
+
+python3 -m bench.loadgen --stand-in --rate 200 --duration 10 --keys 4
+python3 -m bench.loadgen --url http://host:8080/api/v1 --scenario bench/scenario.jsonl
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import random
+import time
+
+from solders.keypair import Keypair
+
+from bench.exchange import start_exchange
+from common import instrumentation
+from common.async_rest_client import AsyncPacificaRestClient
+from common.instrumentation import HistogramRecorder, LatencyHistogram
+from common.keystore import KeyStore
+from common.order_ids import client_order_ids
+
+
+ACTIONS = ("create_order", "create_market_order", "cancel_order", "batch_orders")
+
+DEFAULT_SCENARIO = [
+    {"action": "create_order", "weight": 6},
+    {"action": "cancel_order", "weight": 3},
+    {"action": "create_market_order", "weight": 1},
+    {"action": "batch_orders", "weight": 1, "size": 4},
+]
+
+
+def load_scenario(path):
+    steps = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            step = json.loads(line)
+            if step.get("action") not in ACTIONS:
+                raise ValueError(
+                    f"{path}:{line_number}: unknown action {step.get('action')!r}"
+                )
+            steps.append(step)
+    if not steps:
+        raise ValueError(f"{path}: scenario is empty")
+    return steps
+
+
+def limit_order_payload(overrides):
+    return {
+        "symbol": "BTC",
+        "price": str(100_000),
+        "reduce_only": False,
+        "amount": "0.1",
+        "side": "bid",
+        "tif": "GTC",
+        **overrides,
+        "client_order_id": client_order_ids.next_id(),
+    }
+
+
+def market_order_payload(overrides):
+    return {
+        "symbol": "BTC",
+        "reduce_only": False,
+        "amount": "0.1",
+        "side": "bid",
+        "slippage_percent": "0.5",
+        **overrides,
+        "client_order_id": client_order_ids.next_id(),
+    }
+
+
+class Worker:
+    # One client per key, plus the orders it has open for cancels to target
+
+    def __init__(self, client):
+        self.client = client
+        self.open_orders = collections.deque()
+
+    def take_open_order(self):
+        return self.open_orders.popleft() if self.open_orders else None
+
+
+class ActionStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses = collections.Counter()
+        self.errors = 0
+
+    def record(self, seconds, status, ok):
+        self.latency.record(seconds)
+        self.statuses[status] += 1
+        if not ok:
+            self.errors += 1
+
+    def to_dict(self, elapsed):
+        latency = self.latency.to_dict()
+        return {
+            "requests": latency["count"],
+            "rate": latency["count"] / elapsed if elapsed else 0,
+            "errors": self.errors,
+            "error_rate": self.errors / latency["count"] if latency["count"] else 0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "latency_us": latency,
+        }
+
+
+class LoadGenerator:
+    def __init__(self, workers, scenario, rate, concurrency, duration, seed=None):
+        self.workers = workers
+        self.scenario = scenario
+        self.rate = rate
+        self.duration = duration
+        self.random = random.Random(seed)
+        self.stats = collections.defaultdict(ActionStats)
+        self.total = ActionStats()
+        self.elapsed = 0.0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._weights = [step.get("weight", 1) for step in scenario]
+
+    def _request(self, worker, step):
+        # -> (action recorded, coroutine, client_order_ids to track on success)
+        action = step["action"]
+        overrides = step.get("payload", {})
+        client = worker.client
+
+        if action == "cancel_order":
+            open_order = worker.take_open_order()
+            if open_order is not None:
+                symbol, client_order_id = open_order
+                payload = {"symbol": symbol, "client_order_id": client_order_id}
+                return action, client.cancel_order(payload), []
+            action = "create_order"
+
+        if action == "create_order":
+            payload = limit_order_payload(overrides)
+            return action, client.create_order(payload), [payload]
+        if action == "create_market_order":
+            payload = market_order_payload(overrides)
+            return action, client.create_market_order(payload), []
+
+        actions, created = [], []
+        for i in range(step.get("size", 4)):
+            open_order = worker.take_open_order() if i % 2 else None
+            if open_order is None:
+                payload = limit_order_payload(overrides)
+                actions.append(("create_order", payload))
+                created.append(payload)
+            else:
+                symbol, client_order_id = open_order
+                cancel = {"symbol": symbol, "client_order_id": client_order_id}
+                actions.append(("cancel_order", cancel))
+        return action, client.batch_orders(actions), created
+
+    async def _issue(self, worker, step, due):
+        async with self._slots:
+            action, request, created = self._request(worker, step)
+            try:
+                response = await request
+                status = response.status_code
+                ok = status == 200 and response.json().get("success", False)
+            except Exception as e:
+                status, ok = type(e).__name__, False
+        latency = time.perf_counter() - due
+
+        if ok:
+            for payload in created:
+                worker.open_orders.append(
+                    (payload["symbol"], payload["client_order_id"])
+                )
+        self.stats[action].record(latency, status, ok)
+        self.total.record(latency, status, ok)
+
+    async def run(self):
+        interval = 1.0 / self.rate
+        start = time.perf_counter()
+        tasks = []
+        for i in range(int(self.rate * self.duration)):
+            due = start + i * interval
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            step = self.random.choices(self.scenario, weights=self._weights)[0]
+            worker = self.workers[i % len(self.workers)]
+            tasks.append(asyncio.create_task(self._issue(worker, step, due)))
+        await asyncio.gather(*tasks)
+        self.elapsed = time.perf_counter() - start
+
+    def report(self):
+        return {
+            "elapsed": self.elapsed,
+            "target_rate": self.rate,
+            "actions": {
+                action: stats.to_dict(self.elapsed)
+                for action, stats in sorted(self.stats.items())
+            },
+            "total": self.total.to_dict(self.elapsed),
+        }
+
+
+def print_report(report):
+    print(
+        f"{'action':<22}{'requests':>10}{'req/s':>10}{'errors':>9}"
+        f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    )
+    rows = list(report["actions"].items()) + [("total", report["total"])]
+    for action, row in rows:
+        latency = row["latency_us"]
+        print(
+            f"{action:<22}{row['requests']:>10}{row['rate']:>10.1f}"
+            f"{row['error_rate']:>8.1%} "
+            f"{latency['p50_us'] / 1e3:>9.2f}{latency['p90_us'] / 1e3:>9.2f}"
+            f"{latency['p99_us'] / 1e3:>9.2f}{latency['max_us'] / 1e3:>9.2f}"
+        )
+    print(f"\nstatuses: {report['total']['statuses']}")
+
+
+async def run(args, base_url, keypairs):
+    clients = [
+        AsyncPacificaRestClient(
+            keypair,
+            account=account,
+            base_url=base_url,
+            max_in_flight=args.concurrency,
+            max_connections=args.concurrency,
+            api_key=args.api_key,
+            http2=args.http2,
+        )
+        for keypair, account in keypairs
+    ]
+    generator = LoadGenerator(
+        [Worker(client) for client in clients],
+        load_scenario(args.scenario) if args.scenario else DEFAULT_SCENARIO,
+        args.rate,
+        args.concurrency,
+        args.duration,
+        seed=args.seed,
+    )
+    try:
+        await generator.run()
+    finally:
+        for client in clients:
+            await client.aclose()
+    return generator.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="REST base URL, e.g. http://host:port/api/v1")
+    target.add_argument(
+        "--stand-in", action="store_true", help="start bench.exchange in-process"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.002, help="stand-in reply latency (s)"
+    )
+    parser.add_argument("--scenario", help="JSONL scenario file")
+    parser.add_argument("--rate", type=float, default=100, help="requests per second")
+    parser.add_argument("--concurrency", type=int, default=16, help="max in flight")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument(
+        "--keys", type=int, default=1, help="number of generated keypairs"
+    )
+    parser.add_argument("--key-file", help="JSON key file (see common/keystore.py)")
+    parser.add_argument("--api-key", help="API config key sent as PF-API-KEY")
+    parser.add_argument("--http2", action="store_true")
+    parser.add_argument("--seed", type=int, help="seed for the action mix")
+    parser.add_argument(
+        "--stages", action="store_true", help="also report per-stage latencies"
+    )
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args()
+
+    if args.key_file:
+        keystore = KeyStore()
+        keystore.load_file(args.key_file)
+        keypairs = [(entry.keypair, entry.account) for entry in keystore]
+    else:
+        keypairs = [(Keypair(), None) for _ in range(args.keys)]
+
+    exchange = start_exchange(latency=args.latency) if args.stand_in else None
+    base_url = exchange.rest_url if exchange else args.url
+    recorder = HistogramRecorder() if args.stages else None
+    instrumentation.set_recorder(recorder)
+
+    try:
+        report = asyncio.run(run(args, base_url, keypairs))
+    finally:
+        instrumentation.set_recorder(None)
+        if exchange is not None:
+            exchange.close()
+
+    if recorder is not None:
+        report["stages"] = recorder.snapshot()
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
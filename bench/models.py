@@ -0,0 +1,74 @@
+"""
+Memory and decode time of a large TWAP order history response, decoded into
+nested dicts with json.loads versus ApiResponse with TwapOrder records.
+
+python3 -m bench.models
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+import uuid
+
+from common.models import ApiResponse, TwapOrder, orjson
+
+
+ENTRIES = 20_000
+
+
+def history_body():
+    now = int(time.time() * 1_000)
+    data = [
+        {
+            "order_id": i,
+            "client_order_id": str(uuid.uuid4()),
+            "symbol": "BTC",
+            "side": "bid" if i % 2 else "ask",
+            "amount": "1",
+            "filled_amount": "0.5",
+            "slippage_percent": "0.5",
+            "duration_in_seconds": 180,
+            "reduce_only": False,
+            "status": "finished",
+            "created_at": now - i * 1_000,
+            "updated_at": now,
+        }
+        for i in range(ENTRIES)
+    ]
+    return json.dumps({"success": True, "data": data, "error": None}).encode()
+
+
+def measure(decode):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = decode()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main():
+    raw = history_body()
+    print(f"{ENTRIES} entries, {len(raw) / 1e6:.1f} MB body, orjson: {bool(orjson)}")
+
+    def decode_records():
+        response = ApiResponse(200, raw, TwapOrder)
+        response.data  # force decoding
+        return response
+
+    rows = [
+        ("json.loads", lambda: json.loads(raw)),
+        ("ApiResponse", decode_records),
+    ]
+    print(f"{'decoder':<14}{'retained MB':>14}{'decode ms':>12}")
+    for name, decode in rows:
+        result, retained, elapsed = measure(decode)
+        print(f"{name:<14}{retained / 1e6:>14.1f}{elapsed * 1e3:>12.1f}")
+        del result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Representative signature headers and payloads used by the benchmarks. The shapes
+mirror the examples in rest/ and ws/ so the numbers reflect real traffic.
+"""
+
+import uuid
+
+
+def order_header(timestamp, message_type="create_order"):
+    return {
+        "timestamp": timestamp,
+        "expiry_window": 5_000,
+        "type": message_type,
+    }
+
+
+def order_payload():
+    return {
+        "symbol": "BTC",
+        "price": str(100_000),
+        "reduce_only": False,
+        "amount": "0.1",
+        "side": "bid",
+        "tif": "GTC",
+        "client_order_id": str(uuid.uuid4()),
+    }
+
+
+def tpsl_payload():
+    return {
+        "symbol": "BTC",
+        "side": "ask",
+        "take_profit": {
+            "stop_price": "120000",
+            "limit_price": "120300",
+            "amount": "0.1",
+            "client_order_id": str(uuid.uuid4()),
+        },
+        "stop_loss": {
+            "stop_price": "99800",
+        },
+    }
+
+
+def batch_payload(size=100):
+    # A batch as a single nested document, alternating creates and cancels.
+    actions = []
+    for i in range(size):
+        if i % 2 == 0:
+            actions.append({"type": "Create", "data": order_payload()})
+        else:
+            actions.append(
+                {"type": "Cancel", "data": {"symbol": "BTC", "order_id": 42069 + i}}
+            )
+    return {"actions": actions}
+
+
+def shapes(timestamp):
+    # (name, header, payload) for each payload shape the benchmarks cover.
+    return [
+        ("order", order_header(timestamp), order_payload()),
+        ("tpsl", order_header(timestamp, "set_position_tpsl"), tpsl_payload()),
+        ("batch", order_header(timestamp, "batch_orders"), batch_payload()),
+    ]
@@ -0,0 +1,79 @@
+"""
+Per-request latency of signed create_order calls against a local stub server,
+comparing module-level requests.post (a new connection per request) with
+PacificaRestClient (one pooled keep-alive session).
+
+python3 -m bench.rest_client
+"""
+
+import statistics
+import time
+
+import requests
+from solders.keypair import Keypair
+
+from bench.payloads import order_header, order_payload
+from bench.stub import start_stub_server
+from common.rest_client import PacificaRestClient
+from common.utils import sign_message
+
+
+REQUESTS = 500
+
+
+def post_per_request(base_url, keypair):
+    public_key = str(keypair.pubkey())
+    header = order_header(int(time.time() * 1_000))
+    payload = order_payload()
+    _, signature = sign_message(header, payload, keypair)
+    request = {
+        "account": public_key,
+        "signature": signature,
+        "timestamp": header["timestamp"],
+        "expiry_window": header["expiry_window"],
+        **payload,
+    }
+    requests.post(
+        f"{base_url}/orders/create",
+        json=request,
+        headers={"Content-Type": "application/json"},
+    )
+
+
+def percentile(samples, fraction):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def measure(func):
+    samples = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def main():
+    server, base_url = start_stub_server()
+    keypair = Keypair()
+
+    client = PacificaRestClient(keypair, base_url=base_url)
+    results = {
+        "requests.post": measure(lambda: post_per_request(base_url, keypair)),
+        "client": measure(lambda: client.create_order(order_payload())),
+    }
+    client.close()
+    server.shutdown()
+
+    print(f"{'path':<16}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}")
+    for name, samples in results.items():
+        print(
+            f"{name:<16}"
+            f"{statistics.mean(samples):>10.0f}"
+            f"{percentile(samples, 0.50):>10.0f}"
+            f"{percentile(samples, 0.99):>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
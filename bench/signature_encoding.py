@@ -0,0 +1,58 @@
+"""
+Measures the per-signature saving of sign_message_bytes over the previous str-based
+path (str message, .encode, bytes(signature), pure-Python base58, .decode).
+
+python3 -m bench.signature_encoding
+"""
+
+import time
+import timeit
+
+import base58
+from solders.keypair import Keypair
+
+from bench.payloads import shapes
+from common.utils import prepare_message, sign_message_bytes
+
+
+ITERATIONS = 5_000
+
+
+def legacy_sign_message(header, payload, keypair):
+    message = prepare_message(header, payload)
+    message_bytes = message.encode("utf-8")
+    signature = keypair.sign_message(message_bytes)
+    return (message, base58.b58encode(bytes(signature)).decode("ascii"))
+
+
+def main():
+    keypair = Keypair()
+    timestamp = int(time.time() * 1_000)
+
+    print(f"{'shape':<8}{'legacy us':>12}{'bytes us':>12}{'saved us':>12}")
+    for name, header, payload in shapes(timestamp):
+        legacy_message, legacy_signature = legacy_sign_message(header, payload, keypair)
+        message_bytes, signature = sign_message_bytes(header, payload, keypair)
+        assert (legacy_message.encode("utf-8"), legacy_signature) == (
+            message_bytes,
+            signature,
+        ), name
+
+        iterations = ITERATIONS if name != "batch" else ITERATIONS // 10
+        legacy = timeit.timeit(
+            lambda: legacy_sign_message(header, payload, keypair), number=iterations
+        )
+        native = timeit.timeit(
+            lambda: sign_message_bytes(header, payload, keypair), number=iterations
+        )
+
+        print(
+            f"{name:<8}"
+            f"{legacy / iterations * 1e6:>12.2f}"
+            f"{native / iterations * 1e6:>12.2f}"
+            f"{(legacy - native) / iterations * 1e6:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Measures SignerPool throughput (messages per second) for each backend as the
+number of workers grows, signing create_order messages for generated accounts.
+
+python3 -m bench.signer_pool
+"""
+
+import os
+import time
+
+from solders.keypair import Keypair
+
+from bench.payloads import order_header, order_payload
+from common.signer_pool import BACKENDS, SignerPool
+from common.utils import sign_message
+
+
+ACCOUNTS = 32
+JOBS = 20_000
+
+
+def run(pool, jobs, chunked):
+    start = time.perf_counter()
+    if chunked:
+        futures = pool.submit_many(jobs)
+    else:
+        futures = [pool.submit(*job) for job in jobs]
+    for future in futures:
+        future.result()
+    return time.perf_counter() - start
+
+
+def main():
+    keypairs = {f"account-{i}": Keypair() for i in range(ACCOUNTS)}
+    key_ids = list(keypairs)
+    timestamp = int(time.time() * 1_000)
+    jobs = [
+        (order_header(timestamp), order_payload(), key_ids[i % ACCOUNTS])
+        for i in range(JOBS)
+    ]
+
+    # Inline signing on the calling thread is the baseline to beat
+    start = time.perf_counter()
+    for header, payload, key_id in jobs:
+        sign_message(header, payload, keypairs[key_id])
+    inline = time.perf_counter() - start
+    print(f"{'backend':<8}{'workers':>8}{'submit':>14}{'submit_many':>14}")
+    print(f"{'inline':<8}{'':>8}{JOBS / inline:>14.0f}{'':>14}")
+
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for backend in BACKENDS:
+        for workers in worker_counts:
+            with SignerPool(keypairs, max_workers=workers, backend=backend) as pool:
+                # Warm up so process start-up is not counted
+                run(pool, jobs[: workers * 4], chunked=False)
+                single = run(pool, jobs, chunked=False)
+                chunked = run(pool, jobs, chunked=True)
+            print(
+                f"{backend:<8}{workers:>8}"
+                f"{JOBS / single:>14.0f}{JOBS / chunked:>14.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Micro-benchmarks for each stage of the signing pipeline, per payload shape.
+
+Stages are timed on their own (sort_json_keys, the json.dumps step,
+prepare_message, keypair.sign_message, the base58 package and encode_signature)
+and end to end through sign_message and sign_message_bytes. Keys are generated, so
+nothing touches the network.
+
+Record a baseline, then compare later runs against it:
+
+python3 -m bench.signing --output bench/signing_baseline.json
+python3 -m bench.signing --compare bench/signing_baseline.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+
+import base58
+from solders.keypair import Keypair
+
+from bench.payloads import shapes
+from common.utils import (
+    encode_signature,
+    prepare_message,
+    sign_message,
+    sign_message_bytes,
+    sort_json_keys,
+)
+
+
+REPEAT = 5
+
+
+def measure(func):
+    # Best of REPEAT runs, each long enough (>= 0.2 s) to swamp timer resolution
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+
+def stages(header, payload, keypair):
+    data = {**header, "data": payload}
+    sorted_data = sort_json_keys(data)
+    message = prepare_message(header, payload)
+    message_bytes = message.encode("utf-8")
+    signature = keypair.sign_message(message_bytes)
+    signature_bytes = bytes(signature)
+
+    return {
+        "sort_json_keys": lambda: sort_json_keys(data),
+        "json_dumps": lambda: json.dumps(sorted_data, separators=(",", ":")),
+        "prepare_message": lambda: prepare_message(header, payload),
+        "sign": lambda: keypair.sign_message(message_bytes),
+        "b58encode": lambda: base58.b58encode(signature_bytes).decode("ascii"),
+        "encode_signature": lambda: encode_signature(signature),
+        "sign_message": lambda: sign_message(header, payload, keypair),
+        "sign_message_bytes": lambda: sign_message_bytes(header, payload, keypair),
+    }
+
+
+def run():
+    keypair = Keypair()
+    timestamp = int(time.time() * 1_000)
+
+    results = {}
+    for name, header, payload in shapes(timestamp):
+        results[name] = {
+            stage: measure(func) * 1e6
+            for stage, func in stages(header, payload, keypair).items()
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for shape, timings in results.items():
+        for stage, value in timings.items():
+            previous = baseline.get(shape, {}).get(stage)
+            if previous and value > previous * (1 + tolerance):
+                regressions.append((shape, stage, previous, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed slowdown relative to the baseline (default: 0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    results = run()
+
+    stage_names = list(next(iter(results.values())))
+    print(f"{'us/op':<10}" + "".join(f"{stage:>20}" for stage in stage_names))
+    for shape, timings in results.items():
+        print(f"{shape:<10}" + "".join(f"{timings[s]:>20.2f}" for s in stage_names))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "unit": "us",
+                    "results": results,
+                },
+                f,
+                indent=4,
+            )
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for shape, stage, previous, value in regressions:
+            print(f"REGRESSION {shape}/{stage}: {previous:.2f} us -> {value:.2f} us")
+        if regressions:
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Minimal local HTTP/1.1 endpoint for transport benchmarks. Every POST or GET is
+answered with a small JSON success body over a keep-alive connection, optionally
+after a fixed delay.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+RESPONSE_BODY = b'{"success":true,"data":null,"error":null,"code":null}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, so Nagle would hold back the body
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE_BODY)))
+        self.end_headers()
+        self.wfile.write(RESPONSE_BODY)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply()
+
+    def do_GET(self):
+        self._reply()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for every connection a concurrent client opens at once
+    request_queue_size = 512
+    # Seconds each request is held to stand in for network and server time
+    latency = 0
+
+
+def start_stub_server(host="127.0.0.1", port=0, latency=0):
+    server = StubServer((host, port), StubHandler)
+    server.latency = latency
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
@@ -0,0 +1,85 @@
+"""
+Compares signing-message construction through MessageTemplate with the full
+prepare_message path for repeated create_order, cancel_order and
+create_market_order messages.
+
+python3 -m bench.templates
+"""
+
+import time
+import timeit
+import uuid
+
+from common.templates import (
+    CANCEL_ORDER_FIELDS,
+    CREATE_MARKET_ORDER_FIELDS,
+    CREATE_ORDER_FIELDS,
+    MessageTemplate,
+)
+from common.utils import prepare_message
+
+
+ITERATIONS = 50_000
+
+
+def cases():
+    cloid = str(uuid.uuid4())
+    return [
+        (
+            MessageTemplate(
+                "create_order",
+                {"symbol": "BTC", "reduce_only": False, "side": "bid", "tif": "GTC"},
+                CREATE_ORDER_FIELDS,
+            ),
+            {"price": "100000", "amount": "0.1", "client_order_id": cloid},
+        ),
+        (
+            MessageTemplate("cancel_order", {"symbol": "BTC"}, CANCEL_ORDER_FIELDS),
+            {"order_id": 42069},
+        ),
+        (
+            MessageTemplate(
+                "create_market_order",
+                {
+                    "symbol": "BTC",
+                    "reduce_only": False,
+                    "side": "bid",
+                    "slippage_percent": "0.5",
+                },
+                CREATE_MARKET_ORDER_FIELDS,
+            ),
+            {"amount": "0.1", "client_order_id": cloid},
+        ),
+    ]
+
+
+def main():
+    timestamp = int(time.time() * 1_000)
+
+    print(f"{'message':<22}{'full us':>10}{'template us':>14}{'speedup':>10}")
+    for template, values in cases():
+
+        def full():
+            return prepare_message(
+                template.header(timestamp), template.payload(**values)
+            )
+
+        def templated():
+            return template.render(timestamp, **values)
+
+        # The template must produce exactly what the server verifies.
+        assert full() == templated(), template.message_type
+
+        full_time = timeit.timeit(full, number=ITERATIONS)
+        template_time = timeit.timeit(templated, number=ITERATIONS)
+
+        print(
+            f"{template.message_type:<22}"
+            f"{full_time / ITERATIONS * 1e6:>10.2f}"
+            f"{template_time / ITERATIONS * 1e6:>14.2f}"
+            f"{full_time / template_time:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Cost of decoding WebSocket frames and its effect on event-loop lag.
+
+First, the time to decode a small and a large prices frame with each JSON backend.
+Then a feed server in a separate process streams large frames at a fixed rate to a
+SubscriptionClient, once per FrameDecoder mode. A probe coroutine on the client's
+loop sleeps 1 ms at a time and records how late it wakes up. That lag is what an
+order-submission coroutine on the same loop would see.
+
+python3 -m bench.ws_decode
+"""
+
+import asyncio
+import json
+import multiprocessing
+import time
+import timeit
+
+from websockets.asyncio.server import serve
+
+from common.instrumentation import LatencyHistogram
+from common.ws_decode import JSON_BACKENDS, MODES, FrameDecoder
+from common.ws_subscriptions import SubscriptionClient
+
+
+FRAMES_PER_SECOND = 200
+DURATION = 3.0
+PROBE_INTERVAL = 0.001
+
+
+def prices_frame(symbols):
+    return json.dumps(
+        {
+            "channel": "prices",
+            "data": [
+                {
+                    "symbol": f"SYM{i}",
+                    "mark": "105123.45",
+                    "mid": "105120.5",
+                    "oracle": "105119.87",
+                    "funding": "0.0000125",
+                    "next_funding": "0.0000118",
+                    "open_interest": "1234.5678",
+                    "volume_24h": "987654321.12",
+                    "yesterday_price": "104000.1",
+                    "timestamp": 1_750_000_000_000 + i,
+                }
+                for i in range(symbols)
+            ],
+        }
+    )
+
+
+def decode_costs():
+    frames = {"small": prices_frame(3), "large": prices_frame(200)}
+    print(f"{'backend':<10}{'frame':<8}{'bytes':>8}{'us/frame':>12}")
+    for backend, loads in sorted(JSON_BACKENDS.items()):
+        for name, frame in frames.items():
+            timer = timeit.Timer(lambda: loads(frame))
+            number, _ = timer.autorange()
+            per_frame = min(timer.repeat(repeat=5, number=number)) / number
+            print(f"{backend:<10}{name:<8}{len(frame):>8}{per_frame * 1e6:>12.1f}")
+
+
+def run_feed(port_queue, frame, rate, duration):
+    # Runs in its own process so the feed does not share the client's GIL
+    async def handler(websocket):
+        ticks = int(duration * 100)
+        per_tick = max(1, rate // 100)
+        for _ in range(ticks):
+            for _ in range(per_tick):
+                await websocket.send(frame)
+            await asyncio.sleep(0.01)
+        await websocket.close()
+
+    async def main():
+        async with serve(handler, "127.0.0.1", 0) as server:
+            port_queue.put(server.sockets[0].getsockname()[1])
+            await asyncio.sleep(duration + 30)
+
+    asyncio.run(main())
+
+
+async def probe(lag, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lag.record(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def measure(url, decoder):
+    lag = LatencyHistogram()
+    stop = asyncio.Event()
+    received = 0
+
+    def on_message(message):
+        nonlocal received
+        received += 1
+
+    client = SubscriptionClient(url=url, on_message=on_message, decoder=decoder)
+    probe_task = asyncio.get_running_loop().create_task(probe(lag, stop))
+    start = time.perf_counter()
+    run_task = asyncio.get_running_loop().create_task(client.run())
+    # The feed closes the connection when it is done
+    while client.reconnects == 0:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    await client.close()
+    await run_task
+    stop.set()
+    await probe_task
+    return received / elapsed, lag.to_dict()
+
+
+def main():
+    decode_costs()
+
+    frame = prices_frame(200)
+    context = multiprocessing.get_context("spawn")
+    print(
+        f"\n{len(frame)} byte frames at {FRAMES_PER_SECOND}/s for {DURATION:.0f} s, "
+        f"loop lag of a {PROBE_INTERVAL * 1e3:.0f} ms sleep"
+    )
+    print(
+        f"{'mode':<18}{'frames/s':>10}{'lag p50 ms':>12}"
+        f"{'lag p99 ms':>12}{'lag max ms':>12}"
+    )
+    for backend in sorted(JSON_BACKENDS):
+        for mode in MODES:
+            port_queue = context.Queue()
+            feed = context.Process(
+                target=run_feed,
+                args=(port_queue, frame, FRAMES_PER_SECOND, DURATION),
+                daemon=True,
+            )
+            feed.start()
+            url = f"ws://127.0.0.1:{port_queue.get()}"
+
+            decoder = FrameDecoder(backend=backend, mode=mode)
+            rate, lag = asyncio.run(measure(url, decoder))
+            decoder.close()
+            feed.terminate()
+
+            print(
+                f"{f'{backend} {mode}':<18}{rate:>10.0f}"
+                f"{lag['p50_us'] / 1e3:>12.2f}{lag['p99_us'] / 1e3:>12.2f}"
+                f"{lag['max_us'] / 1e3:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
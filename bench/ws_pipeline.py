@@ -0,0 +1,63 @@
+"""
+Throughput of signed create_order requests over one WsTradingSession against the
+local stand-in exchange, which delays every reply by 5 ms. Request-response (each
+reply awaited before the next send) is compared with pipelined submission at
+several in-flight windows.
+
+python3 -m bench.ws_pipeline
+"""
+
+import asyncio
+import time
+
+from solders.keypair import Keypair
+
+from bench.exchange import start_exchange
+from bench.payloads import order_payload
+from common.ws_session import WsTradingSession
+
+
+REQUESTS = 1_000
+# Simulated network and server time per reply
+LATENCY = 0.005
+
+
+async def request_response(keypair, ws_url):
+    async with WsTradingSession(keypair, url=ws_url) as session:
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            reply = await session.create_order(order_payload())
+            assert reply["code"] == 200
+        return time.perf_counter() - start
+
+
+async def pipelined(keypair, ws_url, max_in_flight):
+    async with WsTradingSession(
+        keypair, url=ws_url, max_in_flight=max_in_flight
+    ) as session:
+        start = time.perf_counter()
+        futures = [
+            await session.send("create_order", order_payload()) for _ in range(REQUESTS)
+        ]
+        replies = await asyncio.gather(*futures)
+        elapsed = time.perf_counter() - start
+    assert all(reply["code"] == 200 for reply in replies)
+    return elapsed
+
+
+def main():
+    exchange = start_exchange(latency=LATENCY)
+    keypair = Keypair()
+
+    elapsed = asyncio.run(request_response(keypair, exchange.ws_url))
+    print(f"{'request-response':<20}{REQUESTS / elapsed:>10.0f} req/s")
+
+    for max_in_flight in (4, 16, 64, 256):
+        elapsed = asyncio.run(pipelined(keypair, exchange.ws_url, max_in_flight))
+        print(f"{f'pipelined x{max_in_flight}':<20}{REQUESTS / elapsed:>10.0f} req/s")
+
+    exchange.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Coalesces individual create/cancel actions into /orders/batch requests.
+
+Callers submit one action at a time and get a future back. Actions submitted within
+`window` seconds of the first pending one, or until `max_actions` are pending, go
+out together as a single batch request, and each future resolves to the result of
+its own action. If the batch request fails as a whole (HTTP status other than 200,
+or success false), every future gets a BatchError instead.
+
+Up to max_in_flight batches are sent concurrently, so a burst larger than
+max_actions goes out in parallel requests rather than one round trip after
+another. While every slot is busy new actions keep accumulating for the next
+batch. Concurrent batches can reach the exchange in any order; max_in_flight=1
+keeps them in submission order. An action whose future is cancelled before its
+batch is cut is not sent.
+
+BatchSubmitter works with PacificaRestClient from any thread, AsyncBatchSubmitter
+with AsyncPacificaRestClient on an event loop.
+
+    with BatchSubmitter(client, window=0.002) as batcher:
+        futures = [
+            batcher.submit("cancel_order", {"symbol": "BTC", "order_id": order_id})
+            for order_id in order_ids
+        ]
+        results = [future.result() for future in futures]
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from common.utils import BATCH_ACTION_TYPES
+
+
+DEFAULT_WINDOW = 0.002
+DEFAULT_MAX_ACTIONS = 10
+DEFAULT_MAX_IN_FLIGHT = 4
+
+
+class BatchError(Exception):
+    # A batch request that failed as a whole; every action in it gets this error
+    def __init__(self, message, status_code=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+def split_batch_response(response, count):
+    # Per-action results are expected under data.results in submission order. A
+    # successful response without them gives every action the whole body; a failed
+    # one raises BatchError.
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    if response.status_code != 200:
+        raise BatchError(
+            f"Batch request failed with status {response.status_code}",
+            response.status_code,
+            body,
+        )
+    if body is None:
+        return [response] * count
+    if isinstance(body, dict) and body.get("success") is False:
+        raise BatchError(
+            f"Batch request failed: {body.get('error')}", response.status_code, body
+        )
+
+    data = body.get("data") if isinstance(body, dict) else None
+    results = data.get("results") if isinstance(data, dict) else None
+    if results is None:
+        return [body] * count
+    if not isinstance(results, list) or len(results) != count:
+        raise BatchError(
+            f"Expected {count} batch results, got {results!r}",
+            response.status_code,
+            body,
+        )
+    return results
+
+
+def _check_action(message_type):
+    if message_type not in BATCH_ACTION_TYPES:
+        raise ValueError(f"Unsupported batch action type: {message_type}")
+
+
+class BatchSubmitter:
+    def __init__(
+        self,
+        client,
+        window=DEFAULT_WINDOW,
+        max_actions=DEFAULT_MAX_ACTIONS,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+    ):
+        self.client = client
+        self.window = window
+        self.max_actions = max_actions
+        self.max_in_flight = max_in_flight
+
+        self._pending = []  # (message_type, payload, future)
+        self._first_at = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, message_type, payload):
+        _check_action(message_type)
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("BatchSubmitter is closed")
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.append((message_type, payload, future))
+            self._condition.notify()
+        return future
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return None
+
+            deadline = self._first_at + self.window
+            while len(self._pending) < self.max_actions and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = self._pending[: self.max_actions]
+            del self._pending[: self.max_actions]
+            if self._pending:
+                self._first_at = time.monotonic()
+            # Cancelled actions are left out; the rest can no longer be cancelled
+            return [
+                action for action in batch if action[2].set_running_or_notify_cancel()
+            ]
+
+    def _run(self):
+        while True:
+            # A batch is cut only once it can be sent, so it fills while slots are busy
+            self._slots.acquire()
+            batch = self._next_batch()
+            if batch is None:
+                self._slots.release()
+                return
+            if not batch:
+                self._slots.release()
+                continue
+            self._executor.submit(self._flush, batch)
+
+    def _flush(self, batch):
+        futures = [future for _, _, future in batch]
+        try:
+            response = self.client.batch_orders(
+                [(message_type, payload) for message_type, payload, _ in batch]
+            )
+            results = split_batch_response(response, len(batch))
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+    def close(self):
+        # Pending actions are still sent before the workers exit
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncBatchSubmitter:
+    def __init__(
+        self,
+        client,
+        window=DEFAULT_WINDOW,
+        max_actions=DEFAULT_MAX_ACTIONS,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+    ):
+        self.client = client
+        self.window = window
+        self.max_actions = max_actions
+        self.max_in_flight = max_in_flight
+
+        self._pending = []  # (message_type, payload, future)
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._flushes = set()
+        self._closed = False
+        self._task = None
+
+    def submit(self, message_type, payload):
+        _check_action(message_type)
+        if self._closed:
+            raise RuntimeError("AsyncBatchSubmitter is closed")
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((message_type, payload, future))
+        self._wakeup.set()
+        return future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # A batch is cut only once it can be sent, so it fills while slots are busy
+            await self._slots.acquire()
+            while not self._pending:
+                if self._closed:
+                    self._slots.release()
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            # Give the window a chance to fill unless the batch is already full
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_actions and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = self._pending[: self.max_actions]
+            del self._pending[: self.max_actions]
+            batch = [action for action in batch if not action[2].cancelled()]
+            if not batch:
+                self._slots.release()
+                continue
+            flush = loop.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch):
+        futures = [future for _, _, future in batch]
+        try:
+            response = await self.client.batch_orders(
+                [(message_type, payload) for message_type, payload, _ in batch]
+            )
+            results = split_batch_response(response, len(batch))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+        if self._flushes:
+            await asyncio.gather(*self._flushes)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
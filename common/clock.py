@@ -0,0 +1,121 @@
+"""
+Estimates the offset between the local clock and the server clock so signed
+headers carry timestamps the server agrees with.
+
+Each observation is a server timestamp together with the local send and receive
+times of the request it came from. As in NTP, the server is assumed to have
+stamped the reply halfway through the round trip:
+
+    offset = server_time - (sent_at + received_at) / 2
+
+Samples with the shortest round trip have the least queuing noise, so the offset
+is taken from the fastest recent sample. Jitter is the spread of the recent
+offsets.
+
+    response = requests.post(...)  # sent_at/received_at measured around it
+    server_clock.observe_http_date(response.headers["Date"], sent_at, received_at)
+    signature_header = server_clock.header("create_order")
+"""
+
+import email.utils
+import statistics
+import threading
+import time
+from collections import deque
+
+
+def local_time_ms():
+    return time.time() * 1_000
+
+
+class ServerClock:
+    def __init__(self, window=32, max_rtt_ms=5_000):
+        self.max_rtt_ms = max_rtt_ms
+        self._samples = deque(maxlen=window)  # (rtt_ms, offset_ms)
+        self._lock = threading.Lock()
+        self._offset_ms = 0.0
+        self._rtt_ms = None
+        self._jitter_ms = 0.0
+
+    def observe(self, server_time_ms, sent_at_ms, received_at_ms):
+        rtt_ms = received_at_ms - sent_at_ms
+        if rtt_ms < 0 or rtt_ms > self.max_rtt_ms:
+            return False
+
+        offset_ms = server_time_ms - (sent_at_ms + received_at_ms) / 2
+        with self._lock:
+            self._add_sample(rtt_ms, offset_ms)
+        return True
+
+    def observe_http_date(self, date_header, sent_at_ms, received_at_ms):
+        # The Date header only has one second resolution, so it bounds the offset
+        # rather than measuring it. The current estimate is kept if it lies within
+        # the bounds and moved to the nearest bound otherwise.
+        rtt_ms = received_at_ms - sent_at_ms
+        if rtt_ms < 0 or rtt_ms > self.max_rtt_ms:
+            return False
+
+        server_time = email.utils.parsedate_to_datetime(date_header)
+        server_second_ms = server_time.timestamp() * 1_000
+        midpoint_ms = (sent_at_ms + received_at_ms) / 2
+        half_rtt_ms = rtt_ms / 2
+
+        lowest_ms = server_second_ms - midpoint_ms - half_rtt_ms
+        highest_ms = server_second_ms + 1_000 - midpoint_ms + half_rtt_ms
+        # Read and update under one lock so a concurrent observe cannot interleave
+        with self._lock:
+            offset_ms = min(max(self._offset_ms, lowest_ms), highest_ms)
+            self._add_sample(rtt_ms, offset_ms)
+        return True
+
+    def _add_sample(self, rtt_ms, offset_ms):
+        # Callers hold self._lock
+        self._samples.append((rtt_ms, offset_ms))
+        # Most recent of the fastest samples, so ties follow the latest estimate
+        self._rtt_ms, self._offset_ms = min(
+            reversed(self._samples), key=lambda sample: sample[0]
+        )
+        offsets = [offset for _, offset in self._samples]
+        self._jitter_ms = statistics.pstdev(offsets) if len(offsets) > 1 else 0.0
+
+    def timestamp(self):
+        return int(local_time_ms() + self._offset_ms)
+
+    def header(self, message_type, expiry_window=5_000):
+        return {
+            "timestamp": self.timestamp(),
+            "expiry_window": expiry_window,
+            "type": message_type,
+        }
+
+    @property
+    def offset_ms(self):
+        return self._offset_ms
+
+    @property
+    def rtt_ms(self):
+        return self._rtt_ms
+
+    @property
+    def jitter_ms(self):
+        return self._jitter_ms
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "offset_ms": self._offset_ms,
+                "rtt_ms": self._rtt_ms,
+                "jitter_ms": self._jitter_ms,
+                "samples": len(self._samples),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._offset_ms = 0.0
+            self._rtt_ms = None
+            self._jitter_ms = 0.0
+
+
+# Shared clock used for signed headers unless a caller supplies its own
+server_clock = ServerClock()
@@ -0,0 +1,165 @@
+"""
+Long-lived hardware-wallet signing sessions.
+
+sign_with_hardware_wallet starts a new `solana sign-offchain-message` process for
+every message, so process start-up and device connection dominate each signature.
+A HardwareSigningSession keeps its backend open and streams messages through it:
+
+- HelperProcessBackend keeps one helper process running and exchanges one line per
+  message: the canonical message on stdin, the base58 signature (or "ERR <reason>")
+  on stdout. Any helper that holds the device open and speaks this protocol works.
+  Its stderr is drained in a background thread, so a chatty helper cannot block
+  on a full pipe; the last lines are kept for the error when it exits.
+- SolanaCliBackend falls back to one solana CLI invocation per message.
+- FakeDeviceBackend signs with an in-memory keypair so flows can run without a
+  device.
+
+    backend = HelperProcessBackend(["ledger-signer", hardware_wallet_path])
+    with HardwareSigningSession(backend) as session:
+        message, signature = session.sign(signature_header, signature_payload)
+"""
+
+import collections
+import subprocess
+import threading
+
+from common.utils import encode_signature, prepare_message, sign_offchain_message
+
+
+# Lines of helper stderr kept for the error raised when the helper exits
+STDERR_LINES = 20
+
+
+class SolanaCliBackend:
+    def __init__(self, hardware_wallet_path):
+        self.hardware_wallet_path = hardware_wallet_path
+
+    def open(self):
+        pass
+
+    def sign(self, message):
+        return sign_offchain_message(message, self.hardware_wallet_path)
+
+    def close(self):
+        pass
+
+
+class HelperProcessBackend:
+    def __init__(self, cmd):
+        self.cmd = list(cmd)
+        self._process = None
+        self._stderr = collections.deque(maxlen=STDERR_LINES)
+        self._stderr_thread = None
+
+    def open(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        self._process = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            shell=False,
+        )
+        self._stderr.clear()
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr, args=(self._process.stderr,), daemon=True
+        )
+        self._stderr_thread.start()
+
+    def _drain_stderr(self, stream):
+        for line in stream:
+            self._stderr.append(line.rstrip("\n"))
+
+    def sign(self, message):
+        if self._process is None:
+            raise Exception("Hardware signer helper is not running")
+
+        try:
+            # Canonical messages are compact JSON, so they never contain a newline
+            self._process.stdin.write(message + "\n")
+            self._process.stdin.flush()
+        except OSError:
+            # BrokenPipeError: the helper is gone
+            self._exited()
+        reply = self._process.stdout.readline()
+        if not reply:
+            self._exited()
+
+        reply = reply.strip()
+        # "ERR" is delimited: E and R are base58 characters, so a signature can
+        # start with them
+        if reply == "ERR" or reply.startswith("ERR "):
+            raise Exception(f"Ledger signing failed: {reply[3:].strip()}")
+        return reply
+
+    def _exited(self):
+        process, self._process = self._process, None
+        process.wait()
+        # stderr reaches EOF once the helper is gone
+        self._stderr_thread.join(timeout=1)
+        stderr = "\n".join(self._stderr)
+        raise Exception(
+            f"Hardware signer helper exited with code {process.returncode}: {stderr}"
+        )
+
+    def close(self):
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+        except OSError:
+            # The helper already exited with input still buffered
+            pass
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._stderr_thread.join(timeout=1)
+        self._process = None
+
+
+class FakeDeviceBackend:
+    def __init__(self, keypair):
+        self.keypair = keypair
+        self.messages = []
+
+    def open(self):
+        pass
+
+    def sign(self, message):
+        self.messages.append(message)
+        signature = self.keypair.sign_message(message.encode("ascii"))
+        return encode_signature(signature)
+
+    def close(self):
+        pass
+
+
+class HardwareSigningSession:
+    def __init__(self, backend):
+        self.backend = backend
+        # The device signs one message at a time
+        self._lock = threading.Lock()
+
+    def open(self):
+        self.backend.open()
+
+    def sign(self, header, payload):
+        message = prepare_message(header, payload)
+        with self._lock:
+            signature = self.backend.sign(message)
+        return (message, signature)
+
+    def close(self):
+        self.backend.close()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
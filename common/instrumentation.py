@@ -0,0 +1,176 @@
+"""
+Per-stage latency instrumentation for signed requests.
+
+Instrumentation is off until a recorder is installed. The request paths check
+`instrumentation.recorder` once per request and skip all timing while it is None,
+so the disabled cost is a handful of attribute lookups.
+
+Stages, in seconds, recorded per endpoint (the REST path, or "ws:<method>" on the
+WebSocket):
+
+- queue: waiting for a rate-limit token or an in-flight slot
+- prepare_message: building the canonical message
+- sign: signing it and encoding the signature
+- send: from handing the request to the transport until the response is read
+- first_byte: from handing the request to the transport until response headers
+- decode: decoding the response body (ApiResponse)
+
+HistogramRecorder aggregates every (endpoint, stage) into a log-linear, HDR-style
+histogram that can be dumped to JSON or scraped as Prometheus text.
+
+    recorder = set_recorder(HistogramRecorder())
+    ...
+    print(recorder.to_prometheus())
+"""
+
+import json
+import threading
+import time
+
+from common.utils import encode_signature, prepare_message_bytes
+
+
+STAGES = ("queue", "prepare_message", "sign", "send", "first_byte", "decode")
+
+QUANTILES = (
+    ("0.5", "p50_us"),
+    ("0.9", "p90_us"),
+    ("0.99", "p99_us"),
+    ("0.999", "p999_us"),
+)
+
+# Installed recorder, None while instrumentation is disabled
+recorder = None
+
+
+def set_recorder(new_recorder):
+    global recorder
+    recorder = new_recorder
+    return new_recorder
+
+
+def record(endpoint, stage, seconds):
+    if recorder is not None:
+        recorder.record(endpoint, stage, seconds)
+
+
+def timed_sign(endpoint, header, payload, keypair):
+    # sign_message_bytes with the prepare_message and sign stages timed apart
+    started = time.perf_counter()
+    message_bytes = prepare_message_bytes(header, payload)
+    prepared = time.perf_counter()
+    signature = encode_signature(keypair.sign_message(message_bytes))
+    signed = time.perf_counter()
+
+    if recorder is not None:
+        recorder.record(endpoint, "prepare_message", prepared - started)
+        recorder.record(endpoint, "sign", signed - prepared)
+    return (message_bytes, signature)
+
+
+class LatencyHistogram:
+    # Values are whole microseconds. Below 2**SUB_BUCKET_BITS they are counted
+    # exactly; above, each power of two is split into 2**(SUB_BUCKET_BITS - 1)
+    # buckets, which keeps the relative error under about 3%.
+    SUB_BUCKET_BITS = 6
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def _index(self, value_us):
+        shift = value_us.bit_length() - self.SUB_BUCKET_BITS
+        if shift <= 0:
+            return value_us
+        half = 1 << (self.SUB_BUCKET_BITS - 1)
+        return shift * half + (value_us >> shift)
+
+    def _value(self, index):
+        # Midpoint of the bucket
+        if index < 1 << self.SUB_BUCKET_BITS:
+            return index
+        half = 1 << (self.SUB_BUCKET_BITS - 1)
+        shift = index // half - 1
+        mantissa = index - shift * half
+        return (mantissa << shift) + (1 << shift) // 2
+
+    def record(self, seconds):
+        value_us = max(0, int(seconds * 1e6))
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0
+        target = max(1, fraction * self.count)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return max(self.min_us, min(self._value(index), self.max_us))
+        return self.max_us
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total_us / self.count if self.count else 0,
+            "min_us": self.min_us or 0,
+            "p50_us": self.percentile(0.50),
+            "p90_us": self.percentile(0.90),
+            "p99_us": self.percentile(0.99),
+            "p999_us": self.percentile(0.999),
+            "max_us": self.max_us,
+        }
+
+
+class HistogramRecorder:
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get((endpoint, stage))
+            if histogram is None:
+                histogram = self._histograms[(endpoint, stage)] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def histogram(self, endpoint, stage):
+        return self._histograms.get((endpoint, stage))
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for (endpoint, stage), histogram in sorted(self._histograms.items()):
+                result.setdefault(endpoint, {})[stage] = histogram.to_dict()
+            return result
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=4)
+
+    def to_prometheus(self, name="pacifica_request_stage_seconds"):
+        lines = [f"# TYPE {name} summary"]
+        for endpoint, stages in self.snapshot().items():
+            for stage, summary in stages.items():
+                labels = f'endpoint="{endpoint}",stage="{stage}"'
+                for quantile, key in QUANTILES:
+                    value = summary[key] / 1e6
+                    lines.append(f'{name}{{{labels},quantile="{quantile}"}} {value}')
+                total = summary["mean_us"] * summary["count"] / 1e6
+                lines.append(f"{name}_sum{{{labels}}} {total}")
+                lines.append(f"{name}_count{{{labels}}} {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
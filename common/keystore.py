@@ -0,0 +1,164 @@
+"""
+Loads keypairs once and keeps everything derived from them.
+
+Deriving the base58 public key from a keypair is comparatively slow, and the
+examples redo it on every request. A KeyStore loads each key once, from the
+environment, a JSON file or a directory of secrets, indexes it by name and public
+key, and keeps the public key string and the request header fields
+("account", "agent_wallet") ready for the hot path.
+
+Keys are given either as a base58 private key string, as the JSON byte array written
+by `solana-keygen`, or as an object {"private_key": ..., "account": ...}. Setting
+"account" marks the key as an agent wallet signing on behalf of that account.
+
+    store = KeyStore()
+    store.load_env()  # PACIFICA_KEY_MAIN=..., PACIFICA_KEY_AGENT=...,
+                      # PACIFICA_KEY_AGENT_ACCOUNT=<main public key>
+    message, signature, request = store.sign_request("agent", header, payload)
+"""
+
+import json
+import os
+
+from solders.keypair import Keypair
+
+from common.utils import sign_message
+
+
+ENV_PREFIX = "PACIFICA_KEY_"
+ACCOUNT_SUFFIX = "_ACCOUNT"
+
+
+def _parse_key(value):
+    if isinstance(value, dict):
+        keypair, _ = _parse_key(value["private_key"])
+        return keypair, value.get("account")
+    if isinstance(value, list):
+        return Keypair.from_bytes(bytes(value)), None
+
+    value = value.strip()
+    if value.startswith("[") or value.startswith("{"):
+        return _parse_key(json.loads(value))
+    return Keypair.from_base58_string(value), None
+
+
+class KeyEntry:
+    __slots__ = ("name", "keypair", "public_key", "account", "agent_wallet", "_fields")
+
+    def __init__(self, name, keypair, account=None):
+        self.name = name
+        self.keypair = keypair
+        self.public_key = str(keypair.pubkey())
+
+        # An agent wallet signs for another account and identifies itself separately
+        if account is not None and account != self.public_key:
+            self.account = account
+            self.agent_wallet = self.public_key
+            self._fields = {"account": account, "agent_wallet": self.public_key}
+        else:
+            self.account = self.public_key
+            self.agent_wallet = None
+            self._fields = {"account": self.public_key}
+
+    def request_header(self, signature, timestamp, expiry_window):
+        return {
+            **self._fields,
+            "signature": signature,
+            "timestamp": timestamp,
+            "expiry_window": expiry_window,
+        }
+
+    def __repr__(self):
+        return f"KeyEntry(name={self.name!r}, public_key={self.public_key!r})"
+
+
+class KeyStore:
+    def __init__(self):
+        self._by_name = {}
+        self._by_public_key = {}
+
+    def add(self, name, keypair, account=None):
+        if name in self._by_name:
+            raise ValueError(f"Key {name} is already loaded")
+
+        entry = KeyEntry(name, keypair, account)
+        self._by_name[name] = entry
+        self._by_public_key[entry.public_key] = entry
+        return entry
+
+    def load_env(self, prefix=ENV_PREFIX, environ=None):
+        environ = os.environ if environ is None else environ
+
+        entries = []
+        for variable, value in sorted(environ.items()):
+            if not variable.startswith(prefix):
+                continue
+            # PACIFICA_KEY_X_ACCOUNT belongs to PACIFICA_KEY_X when that exists;
+            # otherwise it is a key of its own (e.g. PACIFICA_KEY_SUB_ACCOUNT)
+            if (
+                variable.endswith(ACCOUNT_SUFFIX)
+                and variable[: -len(ACCOUNT_SUFFIX)] in environ
+            ):
+                continue
+            keypair, account = _parse_key(value)
+            account = environ.get(variable + ACCOUNT_SUFFIX, account)
+            name = variable[len(prefix) :].lower()
+            entries.append(self.add(name, keypair, account))
+        return entries
+
+    def load_file(self, path):
+        with open(path) as f:
+            keys = json.load(f)
+
+        entries = []
+        for name, value in keys.items():
+            keypair, account = _parse_key(value)
+            entries.append(self.add(name, keypair, account))
+        return entries
+
+    def load_directory(self, path):
+        # One key per file, named after the file without its extension
+        entries = []
+        for filename in sorted(os.listdir(path)):
+            file_path = os.path.join(path, filename)
+            if filename.startswith(".") or not os.path.isfile(file_path):
+                continue
+            with open(file_path) as f:
+                keypair, account = _parse_key(f.read())
+            name = os.path.splitext(filename)[0]
+            entries.append(self.add(name, keypair, account))
+        return entries
+
+    def get(self, name_or_public_key):
+        entry = self._by_name.get(name_or_public_key)
+        if entry is None:
+            entry = self._by_public_key.get(name_or_public_key)
+        if entry is None:
+            raise KeyError(f"Unknown key: {name_or_public_key}")
+        return entry
+
+    def sign(self, name_or_public_key, header, payload):
+        return sign_message(header, payload, self.get(name_or_public_key).keypair)
+
+    def sign_request(self, name_or_public_key, header, payload):
+        entry = self.get(name_or_public_key)
+        message, signature = sign_message(header, payload, entry.keypair)
+        request = {
+            **entry.request_header(
+                signature, header["timestamp"], header["expiry_window"]
+            ),
+            **payload,
+        }
+        return message, signature, request
+
+    def __contains__(self, name_or_public_key):
+        return (
+            name_or_public_key in self._by_name
+            or name_or_public_key in self._by_public_key
+        )
+
+    def __iter__(self):
+        return iter(self._by_name.values())
+
+    def __len__(self):
+        return len(self._by_name)
@@ -0,0 +1,291 @@
+"""
+Lazily decoded API responses with a record class per kind of object.
+
+ApiResponse keeps the raw body and decodes it when it is first used, all at once
+rather than field by field. Objects in "data" become records of the given model
+(Order, TwapOrder, AgentWallet, ApiKey, Subaccount). A model's FIELDS are the
+fields the API documents: they come first, in that order, in the record's field
+index and in to_dict(), and reading one that a response left out gives None
+rather than an AttributeError. Other fields in the response are kept after them.
+Lists of objects are stored as one shared field index plus a tuple of values per
+row, and records are created on access. A large list such as the TWAP order
+history therefore costs a tuple per entry instead of a dict.
+
+The first read of data, success, error or code decodes the body once, keeps the
+envelope fields and the converted data, and lets the decoded dict tree go. Only
+reading body keeps the full tree.
+
+Decoding uses orjson when it is installed and the standard json module otherwise.
+
+    response = ApiResponse.from_response(
+        client.get_twap_order_history(), TwapOrder
+    )
+    for order in response.data:
+        print(order.order_id, order.get("symbol"))
+"""
+
+import json
+import time
+
+from common import instrumentation
+
+try:
+    import orjson
+except ImportError:  # optional fast path
+    orjson = None
+
+
+def loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def field_index(model, names):
+    # Documented fields first, in FIELDS order, then the others as they appear
+    index = {}
+    for name in model.FIELDS:
+        if name in names:
+            index[name] = len(index)
+    for name in names:
+        if name not in index:
+            index[name] = len(index)
+    return index
+
+
+class Record:
+    __slots__ = ("_index", "_values")
+
+    # Fields the API is documented to return
+    FIELDS = ()
+
+    def __init__(self, index, values):
+        self._index = index
+        self._values = values
+
+    @classmethod
+    def from_dict(cls, item):
+        index = field_index(cls, item)
+        return cls(index, tuple(item[name] for name in index))
+
+    def __getattr__(self, name):
+        # Only reached for names that are not slots. Private names must not look
+        # up fields: before __init__ runs (copy, pickle) _index itself is unset.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self._values[self._index[name]]
+        except KeyError:
+            if name in type(self).FIELDS:
+                return None
+            raise AttributeError(
+                f"{type(self).__name__} has no field {name!r}"
+            ) from None
+
+    def get(self, name, default=None):
+        i = self._index.get(name)
+        return default if i is None else self._values[i]
+
+    def to_dict(self):
+        return {name: self._values[i] for name, i in self._index.items()}
+
+    def __eq__(self, other):
+        if not isinstance(other, Record):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Order(Record):
+    __slots__ = ()
+    FIELDS = (
+        "order_id",
+        "client_order_id",
+        "symbol",
+        "side",
+        "price",
+        "initial_amount",
+        "filled_amount",
+        "cancelled_amount",
+        "order_type",
+        "reduce_only",
+        "created_at",
+        "updated_at",
+    )
+
+
+class TwapOrder(Record):
+    __slots__ = ()
+    FIELDS = (
+        "order_id",
+        "client_order_id",
+        "symbol",
+        "side",
+        "amount",
+        "filled_amount",
+        "slippage_percent",
+        "duration_in_seconds",
+        "reduce_only",
+        "status",
+        "created_at",
+        "updated_at",
+    )
+
+
+class AgentWallet(Record):
+    __slots__ = ()
+    FIELDS = ("agent_wallet", "created_at")
+
+
+class ApiKey(Record):
+    __slots__ = ()
+    FIELDS = ("api_key", "created_at")
+
+
+class Subaccount(Record):
+    __slots__ = ()
+    FIELDS = ("address", "balance", "created_at")
+
+
+class RecordList:
+    __slots__ = ("_model", "_index", "_rows")
+
+    def __init__(self, model, index, rows):
+        self._model = model
+        self._index = index
+        self._rows = rows
+
+    @classmethod
+    def from_dicts(cls, model, items):
+        # One index shared by every row; keys missing from a row read as None
+        seen = {}
+        for item in items:
+            for name in item:
+                if name not in seen:
+                    seen[name] = None
+        index = field_index(model, seen)
+
+        # Repeated short strings (symbols, sides, statuses) share one object
+        strings = {}
+
+        def value(v):
+            if type(v) is str and len(v) <= 16:
+                return strings.setdefault(v, v)
+            return v
+
+        names = tuple(index)
+        rows = [tuple(value(item.get(name)) for name in names) for item in items]
+        return cls(model, index, rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return RecordList(self._model, self._index, self._rows[i])
+        return self._model(self._index, self._rows[i])
+
+    def __iter__(self):
+        model, index = self._model, self._index
+        for row in self._rows:
+            yield model(index, row)
+
+    def column(self, name):
+        i = self._index[name]
+        return [row[i] for row in self._rows]
+
+    def __repr__(self):
+        return f"RecordList({self._model.__name__}, {len(self)} rows)"
+
+
+class ApiResponse:
+    __slots__ = (
+        "status_code",
+        "raw",
+        "model",
+        "endpoint",
+        "_body",
+        "_envelope",
+        "_data",
+    )
+
+    def __init__(self, status_code, raw, model=Record, endpoint=None):
+        self.status_code = status_code
+        self.raw = raw
+        self.model = model
+        # Set by the clients while instrumentation is on, to time the decode
+        self.endpoint = endpoint
+        self._body = None
+        self._envelope = None  # the body without "data", once decoded
+        self._data = None
+
+    @classmethod
+    def from_response(cls, response, model=Record):
+        return cls(
+            response.status_code,
+            response.content,
+            model,
+            getattr(response, "endpoint", None),
+        )
+
+    def _load(self):
+        recorder = instrumentation.recorder
+        if recorder is None or self.endpoint is None:
+            return loads(self.raw) if self.raw else {}
+        started = time.perf_counter()
+        body = loads(self.raw) if self.raw else {}
+        recorder.record(self.endpoint, "decode", time.perf_counter() - started)
+        return body
+
+    def _decode(self):
+        # One decode fills the envelope and the converted data; the dict tree is
+        # dropped unless body already holds it
+        body = self._body if self._body is not None else self._load()
+        if isinstance(body, dict):
+            self._envelope = {k: v for k, v in body.items() if k != "data"}
+            data = body.get("data")
+        else:
+            self._envelope = {}
+            data = body
+
+        if isinstance(data, dict):
+            data = self.model.from_dict(data)
+        elif isinstance(data, list) and all(isinstance(d, dict) for d in data):
+            data = RecordList.from_dicts(self.model, data)
+        self._data = data
+
+    @property
+    def body(self):
+        # The full decoded tree, kept for later reads
+        if self._body is None:
+            self._body = self._load()
+        return self._body
+
+    @property
+    def success(self):
+        if self._envelope is None:
+            self._decode()
+        return bool(self._envelope.get("success"))
+
+    @property
+    def error(self):
+        if self._envelope is None:
+            self._decode()
+        return self._envelope.get("error")
+
+    @property
+    def code(self):
+        if self._envelope is None:
+            self._decode()
+        return self._envelope.get("code")
+
+    @property
+    def data(self):
+        if self._envelope is None:
+            self._decode()
+        return self._data
+
+    def __repr__(self):
+        return f"ApiResponse(status_code={self.status_code}, {len(self.raw)} bytes)"
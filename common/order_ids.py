@@ -0,0 +1,118 @@
+"""
+Fast client_order_id allocation with a reverse index back to order intent.
+
+str(uuid.uuid4()) reads os.urandom for every order. ClientOrderIdAllocator draws
+randomness once per process and then only increments a counter, while keeping the
+UUID v4 layout the API expects:
+
+    xxxxxxxx-xxxx-4xxx-8sss-cccccccccccc
+    random session prefix | shard (sss) | 48-bit counter (c)
+
+The shard defaults to the low 12 bits of the process id. Processes whose pids
+differ in those bits cannot collide even if their random prefixes did; pids that
+are a multiple of 4096 apart share a shard and rely on the 60-bit random prefix
+alone. Pass a distinct shard (0-4095) per process when that is not enough. A
+forked child draws a new prefix, takes its own pid as the shard (unless one was
+given) and restarts the counter, so it never repeats the parent's ids.
+
+Allocated ids can be recorded in an OrderIndex, a bounded map from
+client_order_id to whatever metadata the caller attaches, so acks and order
+updates resolve to the originating intent in O(1).
+
+    client_order_id = client_order_ids.allocate({"symbol": "BTC", "side": "bid"})
+    ...
+    intent = client_order_ids.lookup(update["client_order_id"])
+"""
+
+import itertools
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+
+COUNTER_LIMIT = 1 << 48
+
+
+class OrderIndex:
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, client_order_id, metadata):
+        with self._lock:
+            self._entries[client_order_id] = metadata
+            # Evict the oldest orders once full
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, client_order_id, default=None):
+        return self._entries.get(client_order_id, default)
+
+    def pop(self, client_order_id, default=None):
+        with self._lock:
+            return self._entries.pop(client_order_id, default)
+
+    def __contains__(self, client_order_id):
+        return client_order_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Allocators to re-seed in a forked child
+_allocators = weakref.WeakSet()
+
+
+class ClientOrderIdAllocator:
+    def __init__(self, shard=None, index=None):
+        self._fixed_shard = shard
+        self.index = OrderIndex() if index is None else index
+        self._seed()
+        _allocators.add(self)
+
+    def _seed(self):
+        shard = os.getpid() if self._fixed_shard is None else self._fixed_shard
+        shard &= 0xFFF
+
+        random_bits = int.from_bytes(os.urandom(8), "big")
+        time_low = random_bits >> 32
+        time_mid = (random_bits >> 16) & 0xFFFF
+        time_high = (random_bits & 0x0FFF) | 0x4000  # version 4
+        clock_seq = 0x8000 | shard  # RFC 4122 variant, shard in the low 12 bits
+
+        self.shard = shard
+        self._prefix = f"{time_low:08x}-{time_mid:04x}-{time_high:04x}-{clock_seq:04x}-"
+        # next() on itertools.count is atomic, so no lock is needed on the hot path
+        self._counter = itertools.count()
+
+    def next_id(self):
+        value = next(self._counter)
+        if value >= COUNTER_LIMIT:
+            raise OverflowError("client_order_id counter exhausted")
+        return f"{self._prefix}{value:012x}"
+
+    def allocate(self, metadata=None):
+        client_order_id = self.next_id()
+        if metadata is not None:
+            self.index.add(client_order_id, metadata)
+        return client_order_id
+
+    def lookup(self, client_order_id, default=None):
+        return self.index.get(client_order_id, default)
+
+
+def _reseed_after_fork():
+    for allocator in list(_allocators):
+        allocator._seed()
+        # The parent may have held the lock at fork time
+        allocator.index._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
+
+
+# Shared allocator for the REST and WS order examples
+client_order_ids = ClientOrderIdAllocator()
@@ -0,0 +1,229 @@
+"""
+Client-side rate limiting per API config key.
+
+API config keys raise the rate limits of an account. RateLimiter keeps a token
+bucket for each key as a whole and one for each endpoint class under it, so
+requests wait locally instead of being rejected with a 429. A request needs a
+token from both buckets, and buckets refill continuously, which smooths bursts
+to the configured rate.
+
+Cancels take priority over creates: creates leave cancel_reserve tokens of the
+key bucket untouched, so a burst of new orders can never lock out the cancels
+that pull them.
+
+The buckets learn from responses. X-RateLimit-Limit is the number of requests per
+limit window: it resizes the bucket and sets the refill rate to limit / window.
+The window defaults to the configured capacity / rate of the key budget.
+X-RateLimit-Remaining caps the local token count, and a 429 (or Retry-After)
+pauses the bucket for the advertised time. On a 429 without Retry-After,
+X-RateLimit-Reset is read as seconds to wait when it is small and as the epoch
+time of the reset (seconds or milliseconds) when it is large; a wait longer than
+MAX_RESET_WAIT is ignored.
+
+Clients without an API config key are limited per account instead.
+
+Budgets default to conservative placeholders; set them to the limits of the key's
+tier.
+"""
+
+import asyncio
+import threading
+import time
+
+
+CANCEL = "cancel"
+CREATE = "create"
+OTHER = "other"
+
+# Path -> endpoint class, anything else is OTHER
+ENDPOINT_CLASSES = {
+    "/orders/cancel": CANCEL,
+    "/orders/cancel_all": CANCEL,
+    "/orders/twap/cancel": CANCEL,
+    "/orders/create": CREATE,
+    "/orders/create_market": CREATE,
+    "/orders/batch": CREATE,
+    "/orders/twap/create": CREATE,
+    "/positions/tpsl": CREATE,
+}
+
+# (tokens per second, burst capacity)
+DEFAULT_KEY_BUDGET = (20.0, 40)
+DEFAULT_CLASS_BUDGETS = {
+    CANCEL: (20.0, 40),
+    CREATE: (15.0, 30),
+    OTHER: (5.0, 10),
+}
+
+
+# Longest X-RateLimit-Reset wait taken from a 429, in seconds
+MAX_RESET_WAIT = 60.0
+# Reset values above these are epoch times in seconds or milliseconds
+EPOCH_SECONDS = 1e9
+EPOCH_MILLISECONDS = 1e12
+
+
+def endpoint_class(path):
+    return ENDPOINT_CLASSES.get(path, OTHER)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity, now=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.paused_until = 0.0
+        self._now = now
+        self._updated = now()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def wait_time(self, cost=1, reserve=0):
+        # Seconds until cost tokens are available while keeping reserve untouched
+        now = self._now()
+        self._refill(now)
+        pause = max(0.0, self.paused_until - now)
+        # A reserve as large as the bucket would block the request forever
+        reserve = max(0.0, min(reserve, self.capacity - cost))
+        missing = cost + reserve - self.tokens
+        if missing <= 0:
+            return pause
+        return max(pause, missing / self.rate)
+
+    def consume(self, cost=1):
+        self.tokens -= cost
+
+    def learn(self, limit=None, remaining=None, retry_after=None, window=None):
+        now = self._now()
+        self._refill(now)
+        if limit is not None and limit > 0:
+            window = window or self.capacity / self.rate
+            self.capacity = float(limit)
+            self.rate = self.capacity / window
+            self.tokens = min(self.tokens, self.capacity)
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+        if retry_after is not None:
+            self.paused_until = max(self.paused_until, now + retry_after)
+
+
+def _header_number(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _reset_wait(reset):
+    # Seconds until the reset, or None if the value is not plausible
+    if reset is None:
+        return None
+    if reset > EPOCH_MILLISECONDS:
+        reset = reset / 1_000 - time.time()
+    elif reset > EPOCH_SECONDS:
+        reset = reset - time.time()
+    if 0 <= reset <= MAX_RESET_WAIT:
+        return reset
+    return None
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        key_budget=DEFAULT_KEY_BUDGET,
+        class_budgets=None,
+        cancel_reserve=5,
+        limit_window=None,
+        now=time.monotonic,
+    ):
+        self.key_budget = key_budget
+        # Seconds X-RateLimit-Limit counts over
+        self.limit_window = limit_window or key_budget[1] / key_budget[0]
+        self.class_budgets = {**DEFAULT_CLASS_BUDGETS, **(class_budgets or {})}
+        self.cancel_reserve = cancel_reserve
+        self._now = now
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _buckets_for(self, api_key, request_class):
+        key_bucket = self._buckets.get((api_key, None))
+        if key_bucket is None:
+            key_bucket = TokenBucket(*self.key_budget, now=self._now)
+            self._buckets[(api_key, None)] = key_bucket
+        class_bucket = self._buckets.get((api_key, request_class))
+        if class_bucket is None:
+            class_bucket = TokenBucket(
+                *self.class_budgets[request_class], now=self._now
+            )
+            self._buckets[(api_key, request_class)] = class_bucket
+        return key_bucket, class_bucket
+
+    def try_acquire(self, api_key, request_class, cost=1):
+        # Takes the tokens and returns 0, or returns how long to wait before retrying
+        reserve = 0 if request_class == CANCEL else self.cancel_reserve
+        with self._lock:
+            key_bucket, class_bucket = self._buckets_for(api_key, request_class)
+            # Waiting could never gather more tokens than a bucket holds
+            if cost > min(key_bucket.capacity, class_bucket.capacity):
+                raise ValueError(
+                    f"Cost {cost} exceeds the capacity of the {request_class} buckets"
+                )
+            wait = max(
+                key_bucket.wait_time(cost, reserve), class_bucket.wait_time(cost)
+            )
+            if wait == 0:
+                key_bucket.consume(cost)
+                class_bucket.consume(cost)
+            return wait
+
+    def acquire(self, api_key, request_class, cost=1):
+        while True:
+            wait = self.try_acquire(api_key, request_class, cost)
+            if wait == 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, api_key, request_class, cost=1):
+        while True:
+            wait = self.try_acquire(api_key, request_class, cost)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def observe(self, api_key, request_class, status_code, headers):
+        limit = _header_number(headers, "X-RateLimit-Limit")
+        remaining = _header_number(headers, "X-RateLimit-Remaining")
+        retry_after = _header_number(headers, "Retry-After")
+        if status_code == 429 and retry_after is None:
+            retry_after = _reset_wait(_header_number(headers, "X-RateLimit-Reset"))
+
+        if limit is None and remaining is None and retry_after is None:
+            if status_code != 429:
+                return
+            # Throttled without any hint: wait for one token's worth of time
+            retry_after = 1 / self.key_budget[0]
+
+        with self._lock:
+            key_bucket, class_bucket = self._buckets_for(api_key, request_class)
+            # The headers describe the key-wide limit
+            key_bucket.learn(limit, remaining, retry_after, self.limit_window)
+            if status_code == 429:
+                class_bucket.learn(retry_after=retry_after)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                f"{api_key}/{request_class or 'key'}": {
+                    "tokens": bucket.tokens,
+                    "capacity": bucket.capacity,
+                    "rate": bucket.rate,
+                }
+                for (api_key, request_class), bucket in self._buckets.items()
+            }
@@ -0,0 +1,406 @@
+"""
+REST client that sends every operation over one pooled keep-alive session.
+
+The examples call requests.post directly, so each request opens a new connection
+and pays TCP and TLS setup. PacificaRestClient keeps a requests.Session whose
+connection pool is sized for the expected concurrency and reuses it for every
+signed operation. With http2=True, or any transport from common.transport,
+requests are multiplexed over a single HTTP/2 connection instead.
+
+Timestamps come from a ServerClock, which learns the server offset from the Date
+header of each response. Per-stage latencies are recorded when a recorder is
+installed with common.instrumentation.set_recorder.
+
+    client = PacificaRestClient(keypair)
+    response = client.create_order(
+        {
+            "symbol": "BTC",
+            "price": "100000",
+            "reduce_only": False,
+            "amount": "0.1",
+            "side": "bid",
+            "tif": "GTC",
+            "client_order_id": client_order_ids.allocate(),
+        }
+    )
+"""
+
+import json
+import time
+
+from common import instrumentation
+from common.clock import local_time_ms, server_clock
+from common.constants import REST_URL
+from common.keystore import KeyEntry
+from common.rate_limit import endpoint_class
+from common.transport import HttpxTransport, RequestsTransport
+from common.utils import BATCH_ACTION_TYPES, sign_message_bytes
+
+
+DEFAULT_EXPIRY_WINDOW = 5_000
+
+# Signature type -> path of the endpoint accepting it
+ENDPOINTS = {
+    "create_order": "/orders/create",
+    "create_market_order": "/orders/create_market",
+    "cancel_order": "/orders/cancel",
+    "cancel_all_orders": "/orders/cancel_all",
+    "set_position_tpsl": "/positions/tpsl",
+    "create_twap_order": "/orders/twap/create",
+    "cancel_twap_order": "/orders/twap/cancel",
+    "transfer_funds": "/account/subaccount/transfer",
+    "bind_agent_wallet": "/agent/bind",
+    "list_agent_wallets": "/agent/list",
+    "revoke_agent_wallet": "/agent/revoke",
+    "revoke_all_agent_wallets": "/agent/revoke_all",
+    "list_agent_ip_whitelist": "/agent/ip_whitelist/list",
+    "add_agent_whitelisted_ip": "/agent/ip_whitelist/add",
+    "remove_agent_whitelisted_ip": "/agent/ip_whitelist/remove",
+    "set_agent_ip_whitelist_enabled": "/agent/ip_whitelist/toggle",
+    "create_api_key": "/account/api_keys/create",
+    "revoke_api_key": "/account/api_keys/revoke",
+    "list_api_keys": "/account/api_keys",
+}
+BATCH_PATH = "/orders/batch"
+CREATE_SUBACCOUNT_PATH = "/account/subaccount/create"
+OPEN_TWAP_ORDERS_PATH = "/orders/twap"
+TWAP_ORDER_HISTORY_PATH = "/orders/twap/history"
+TWAP_ORDER_HISTORY_BY_ID_PATH = "/orders/twap/history_by_id"
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+# Header carrying the API config key that raises the account's rate limits
+API_KEY_HEADER = "PF-API-KEY"
+
+
+def http_headers(api_key=None):
+    if api_key is None:
+        return dict(JSON_HEADERS)
+    return {**JSON_HEADERS, API_KEY_HEADER: api_key}
+
+
+def encode_body(request):
+    return json.dumps(request, separators=(",", ":")).encode("utf-8")
+
+
+def record_response(recorder, path, started, response):
+    # send, first_byte, and tag the response so ApiResponse can time decode.
+    # httpx transports stamp first_byte_at when headers arrive; requests measures
+    # elapsed up to the headers itself.
+    finished = time.perf_counter()
+    recorder.record(path, "send", finished - started)
+    first_byte_at = getattr(response, "first_byte_at", None)
+    if first_byte_at is not None:
+        recorder.record(path, "first_byte", first_byte_at - started)
+    elif hasattr(response, "elapsed"):
+        recorder.record(path, "first_byte", response.elapsed.total_seconds())
+    response.endpoint = path
+
+
+# Request construction is shared with the async client so both sign and serialize
+# exactly the same way.
+def build_signed_request(
+    key, message_type, payload, clock, expiry_window, endpoint=None
+):
+    # endpoint labels the signing stages when instrumentation is on, and defaults
+    # to the REST path for message_type
+    header = clock.header(message_type, expiry_window)
+    if instrumentation.recorder is None:
+        _, signature = sign_message_bytes(header, payload, key.keypair)
+    else:
+        _, signature = instrumentation.timed_sign(
+            endpoint or ENDPOINTS.get(message_type, message_type),
+            header,
+            payload,
+            key.keypair,
+        )
+    return {
+        **key.request_header(signature, header["timestamp"], expiry_window),
+        **payload,
+    }
+
+
+def build_batch_request(key, actions, clock, expiry_window):
+    # actions: (signature type, payload) pairs, e.g. ("cancel_order", {...})
+    batch = []
+    for message_type, payload in actions:
+        action_type = BATCH_ACTION_TYPES.get(message_type)
+        if action_type is None:
+            raise ValueError(f"Unsupported batch action type: {message_type}")
+        batch.append(
+            {
+                "type": action_type,
+                "data": build_signed_request(
+                    key, message_type, payload, clock, expiry_window
+                ),
+            }
+        )
+    return {"actions": batch}
+
+
+def build_subaccount_request(main_key, sub_keypair, clock, expiry_window):
+    # Both signatures must have the same timestamp and expiry window
+    timestamp = clock.timestamp()
+    sub_public_key = str(sub_keypair.pubkey())
+
+    sub_header = {
+        "timestamp": timestamp,
+        "expiry_window": expiry_window,
+        "type": "subaccount_initiate",
+    }
+    _, sub_signature = sign_message_bytes(
+        sub_header, {"account": main_key.public_key}, sub_keypair
+    )
+
+    main_header = {
+        "timestamp": timestamp,
+        "expiry_window": expiry_window,
+        "type": "subaccount_confirm",
+    }
+    _, main_signature = sign_message_bytes(
+        main_header, {"signature": sub_signature}, main_key.keypair
+    )
+
+    return {
+        "main_account": main_key.public_key,
+        "subaccount": sub_public_key,
+        "main_signature": main_signature,
+        "sub_signature": sub_signature,
+        "timestamp": timestamp,
+        "expiry_window": expiry_window,
+    }
+
+
+class RestOperations:
+    # The operations shared by the sync and async clients. Each one returns what
+    # _send returns: a Response for PacificaRestClient and an awaitable for
+    # AsyncPacificaRestClient.
+    #
+    # Signed bodies are passed to _send as a callable. They are only built once
+    # the request is about to go out, so waiting for a connection slot or a
+    # rate-limit token does not eat into the expiry window.
+
+    def _send(self, method, path, body=None, params=None):
+        raise NotImplementedError
+
+    def post(self, path, request):
+        return self._send("POST", path, body=encode_body(request))
+
+    def get(self, path, params=None):
+        return self._send("GET", path, params=params)
+
+    def post_signed(self, message_type, payload, expiry_window=None):
+        expiry_window = expiry_window or self.expiry_window
+
+        def build():
+            return encode_body(
+                build_signed_request(
+                    self.key, message_type, payload, self.clock, expiry_window
+                )
+            )
+
+        return self._send("POST", ENDPOINTS[message_type], body=build)
+
+    # ---------------------------------------------------------------
+    # Orders
+    # ---------------------------------------------------------------
+
+    def create_order(self, payload):
+        return self.post_signed("create_order", payload)
+
+    def create_market_order(self, payload):
+        return self.post_signed("create_market_order", payload)
+
+    def cancel_order(self, payload):
+        return self.post_signed("cancel_order", payload)
+
+    def cancel_all_orders(self, all_symbols=True, exclude_reduce_only=False, **extra):
+        payload = {
+            "all_symbols": all_symbols,
+            "exclude_reduce_only": exclude_reduce_only,
+            **extra,
+        }
+        return self.post_signed("cancel_all_orders", payload)
+
+    def batch_orders(self, actions):
+        def build():
+            return encode_body(
+                build_batch_request(self.key, actions, self.clock, self.expiry_window)
+            )
+
+        return self._send("POST", BATCH_PATH, body=build)
+
+    def set_position_tpsl(self, payload):
+        return self.post_signed("set_position_tpsl", payload)
+
+    # ---------------------------------------------------------------
+    # TWAP orders
+    # ---------------------------------------------------------------
+
+    def create_twap_order(self, payload):
+        return self.post_signed("create_twap_order", payload)
+
+    def cancel_twap_order(self, payload):
+        return self.post_signed("cancel_twap_order", payload)
+
+    def get_open_twap_orders(self, account=None):
+        return self.get(OPEN_TWAP_ORDERS_PATH, {"account": account or self.key.account})
+
+    def get_twap_order_history(self, account=None):
+        return self.get(
+            TWAP_ORDER_HISTORY_PATH, {"account": account or self.key.account}
+        )
+
+    def get_twap_order_history_by_id(self, order_id):
+        return self.get(TWAP_ORDER_HISTORY_BY_ID_PATH, {"order_id": order_id})
+
+    # ---------------------------------------------------------------
+    # Subaccounts
+    # ---------------------------------------------------------------
+
+    def create_subaccount(self, sub_keypair):
+        def build():
+            return encode_body(
+                build_subaccount_request(
+                    self.key, sub_keypair, self.clock, self.expiry_window
+                )
+            )
+
+        return self._send("POST", CREATE_SUBACCOUNT_PATH, body=build)
+
+    def transfer_subaccount_fund(self, to_account, amount):
+        return self.post_signed(
+            "transfer_funds", {"to_account": to_account, "amount": amount}
+        )
+
+    # ---------------------------------------------------------------
+    # Agent wallets
+    # ---------------------------------------------------------------
+
+    def bind_agent_wallet(self, agent_wallet):
+        return self.post_signed("bind_agent_wallet", {"agent_wallet": agent_wallet})
+
+    def list_agent_wallets(self):
+        return self.post_signed("list_agent_wallets", {})
+
+    def revoke_agent_wallet(self, agent_wallet):
+        return self.post_signed("revoke_agent_wallet", {"agent_wallet": agent_wallet})
+
+    def revoke_all_agent_wallets(self):
+        return self.post_signed("revoke_all_agent_wallets", {})
+
+    def list_ip_whitelist(self, agent_wallet):
+        return self.post_signed(
+            "list_agent_ip_whitelist", {"api_agent_key": agent_wallet}
+        )
+
+    def add_ip_to_whitelist(self, agent_wallet, ip_address):
+        return self.post_signed(
+            "add_agent_whitelisted_ip",
+            {"agent_wallet": agent_wallet, "ip_address": ip_address},
+        )
+
+    def remove_ip_from_whitelist(self, agent_wallet, ip_address):
+        return self.post_signed(
+            "remove_agent_whitelisted_ip",
+            {"agent_wallet": agent_wallet, "ip_address": ip_address},
+        )
+
+    def toggle_ip_whitelist(self, agent_wallet, enabled):
+        return self.post_signed(
+            "set_agent_ip_whitelist_enabled",
+            {"agent_wallet": agent_wallet, "enabled": enabled},
+        )
+
+    # ---------------------------------------------------------------
+    # API config keys
+    # ---------------------------------------------------------------
+
+    def create_api_config_key(self):
+        return self.post_signed("create_api_key", {})
+
+    def revoke_api_config_key(self, api_key):
+        return self.post_signed("revoke_api_key", {"api_key": api_key})
+
+    def list_api_config_keys(self):
+        return self.post_signed("list_api_keys", {})
+
+
+class PacificaRestClient(RestOperations):
+    def __init__(
+        self,
+        keypair,
+        account=None,
+        base_url=REST_URL,
+        pool_connections=4,
+        pool_maxsize=32,
+        timeout=10,
+        clock=None,
+        expiry_window=DEFAULT_EXPIRY_WINDOW,
+        api_key=None,
+        rate_limiter=None,
+        http2=False,
+        transport=None,
+    ):
+        self.key = KeyEntry("default", keypair, account)
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.clock = server_clock if clock is None else clock
+        self.expiry_window = expiry_window
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter
+        # Rate limits belong to the API config key, else to the account
+        self.rate_limit_key = api_key if api_key is not None else self.key.account
+
+        if transport is None:
+            headers = http_headers(api_key)
+            if http2:
+                transport = HttpxTransport(
+                    headers, http2=True, max_connections=pool_maxsize
+                )
+            else:
+                transport = RequestsTransport(headers, pool_connections, pool_maxsize)
+        self.transport = transport
+
+    def _send(self, method, path, body=None, params=None):
+        recorder = instrumentation.recorder
+        if recorder is not None:
+            queued = time.perf_counter()
+
+        request_class = endpoint_class(path)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(self.rate_limit_key, request_class)
+        if recorder is not None:
+            recorder.record(path, "queue", time.perf_counter() - queued)
+        if callable(body):
+            body = body()
+
+        sent_at = local_time_ms()
+        if recorder is not None:
+            started = time.perf_counter()
+        response = self.transport.request(
+            method, self.base_url + path, body, params, self.timeout
+        )
+        received_at = local_time_ms()
+        if recorder is not None:
+            record_response(recorder, path, started, response)
+
+        date_header = response.headers.get("Date")
+        if date_header:
+            self.clock.observe_http_date(date_header, sent_at, received_at)
+        if self.rate_limiter is not None:
+            self.rate_limiter.observe(
+                self.rate_limit_key,
+                request_class,
+                response.status_code,
+                response.headers,
+            )
+        return response
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,161 @@
+"""
+Idempotent retries and hedged requests for order endpoints.
+
+A request that times out may still have reached the exchange. Retrying is only
+safe because orders carry a client_order_id: the exchange accepts each id once,
+so a retry either places the order or is rejected as a duplicate of the one
+that landed. Creates therefore must have a client_order_id, and cancels must name
+the order (order_id or client_order_id). Every other message type, such as
+transfer_funds or create_api_key, has no idempotency key and is rejected.
+
+Each attempt reuses the signed request while it would still arrive within its
+expiry window, allowing expiry_margin_ms for the trip. Otherwise the request is
+signed again with a fresh timestamp and the same client_order_id.
+
+With hedge_after set, an attempt that has not answered after that many seconds is
+duplicated over a second client (a separate connection pool) and the first answer
+wins, which bounds the tail latency of a stalled connection. If one leg fails, the
+other is still awaited before giving up.
+
+    retrier = OrderRetrier(
+        client,
+        hedge_client=PacificaRestClient(keypair),
+        hedge_after=0.05,
+    )
+    response = retrier.send("create_order", payload)
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+import requests
+
+from common.rest_client import ENDPOINTS, build_signed_request
+
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+# Transport failures from either HTTP stack (common/transport.py)
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    httpx.ConnectError,
+    httpx.TimeoutException,
+)
+
+# Message types that must carry a client_order_id to be retried safely
+IDEMPOTENCY_KEYED = frozenset(
+    {"create_order", "create_market_order", "create_twap_order"}
+)
+# Cancels of one order: repeating them cannot cancel anything else
+CANCELS_BY_ID = frozenset({"cancel_order", "cancel_twap_order"})
+RETRYABLE_TYPES = IDEMPOTENCY_KEYED | CANCELS_BY_ID
+
+
+class OrderRetrier:
+    def __init__(
+        self,
+        client,
+        max_attempts=3,
+        backoff=0.05,
+        max_backoff=1.0,
+        hedge_client=None,
+        hedge_after=None,
+        expiry_margin_ms=1_000,
+        hedge_workers=8,
+    ):
+        self.client = client
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_client = hedge_client
+        self.hedge_after = hedge_after
+        self.expiry_margin_ms = expiry_margin_ms
+
+        self.retries = 0
+        self.hedges = 0
+        self.resigns = 0
+        self._executor = None
+        if hedge_client is not None and hedge_after is not None:
+            self._executor = ThreadPoolExecutor(max_workers=hedge_workers)
+
+    def _sign(self, message_type, payload, expiry_window):
+        return build_signed_request(
+            self.client.key, message_type, payload, self.client.clock, expiry_window
+        )
+
+    def _expiring(self, request):
+        # Could the request reach the server after its expiry if sent now?
+        expires_at = request["timestamp"] + request["expiry_window"]
+        return self.client.clock.timestamp() + self.expiry_margin_ms >= expires_at
+
+    def _attempt(self, path, request):
+        if self._executor is None:
+            return self.client.post(path, request)
+
+        primary = self._executor.submit(self.client.post, path, request)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        hedge = self._executor.submit(self.hedge_client.post, path, request)
+        pending = {primary, hedge}
+        errors = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    errors.append(e)
+        # Both legs failed; a non-retryable error wins so send() does not retry it
+        for error in errors:
+            if not isinstance(error, RETRYABLE_ERRORS):
+                raise error
+        raise errors[0]
+
+    def send(self, message_type, payload, expiry_window=None):
+        if message_type not in RETRYABLE_TYPES:
+            raise ValueError(f"{message_type} is not idempotent and cannot be retried")
+        if message_type in IDEMPOTENCY_KEYED and not payload.get("client_order_id"):
+            raise ValueError(f"{message_type} needs a client_order_id to be retried")
+        if (
+            message_type in CANCELS_BY_ID
+            and payload.get("order_id") is None
+            and not payload.get("client_order_id")
+        ):
+            raise ValueError(f"{message_type} needs an order id to be retried")
+
+        expiry_window = expiry_window or self.client.expiry_window
+        path = ENDPOINTS[message_type]
+        request = self._sign(message_type, payload, expiry_window)
+
+        response = None
+        error = None
+        for attempt in range(self.max_attempts):
+            if attempt > 0:
+                self.retries += 1
+                time.sleep(min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+                if self._expiring(request):
+                    self.resigns += 1
+                    request = self._sign(message_type, payload, expiry_window)
+
+            try:
+                response = self._attempt(path, request)
+            except RETRYABLE_ERRORS as e:
+                error = e
+                continue
+            if response.status_code not in RETRYABLE_STATUS:
+                return response
+
+        if response is not None:
+            return response
+        raise error
+
+    def metrics(self):
+        return {"retries": self.retries, "hedges": self.hedges, "resigns": self.resigns}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
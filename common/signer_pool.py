@@ -0,0 +1,126 @@
+"""
+Signs messages for many accounts and agent wallets in parallel.
+
+Keypairs are registered once under a key id and stay resident in every worker, so
+a job only carries (header, payload, key_id). The thread backend shares the
+keypairs in memory. The process backend ships the secret bytes to each worker once
+at start-up, which lets signing and serialization run on every core.
+
+    keypairs = {"main": keypair, "agent": agent_keypair}
+    with SignerPool(keypairs, backend="process") as pool:
+        future = pool.submit(signature_header, signature_payload, "agent")
+        message, signature = future.result()
+"""
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from solders.keypair import Keypair
+
+from common.utils import sign_message
+
+
+BACKENDS = ("thread", "process")
+
+# Keypairs held by a process-pool worker, populated by _init_worker
+_worker_keypairs = {}
+
+
+def _init_worker(secrets):
+    for key_id, secret in secrets.items():
+        _worker_keypairs[key_id] = Keypair.from_bytes(secret)
+
+
+def _sign_in_worker(header, payload, key_id):
+    return sign_message(header, payload, _worker_keypairs[key_id])
+
+
+def _sign_chunk(jobs, keypairs=None):
+    keypairs = _worker_keypairs if keypairs is None else keypairs
+    return [
+        sign_message(header, payload, keypairs[key_id])
+        for header, payload, key_id in jobs
+    ]
+
+
+def _resolve_chunk(chunk_future, futures):
+    if chunk_future.cancelled():
+        for future in futures:
+            future.cancel()
+        return
+    exception = chunk_future.exception()
+    results = [None] * len(futures) if exception is not None else chunk_future.result()
+    for future, result in zip(futures, results):
+        # Callers may have cancelled their own future in the meantime
+        if not future.set_running_or_notify_cancel():
+            continue
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+class SignerPool:
+    def __init__(self, keypairs, max_workers=None, backend="thread"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend must be one of {BACKENDS}")
+
+        self.backend = backend
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._key_ids = frozenset(keypairs)
+
+        if backend == "thread":
+            self._keypairs = dict(keypairs)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        else:
+            secrets = {key_id: bytes(keypair) for key_id, keypair in keypairs.items()}
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(secrets,),
+            )
+
+    def submit(self, header, payload, key_id):
+        if key_id not in self._key_ids:
+            raise KeyError(f"Unknown key id: {key_id}")
+
+        if self.backend == "thread":
+            return self._executor.submit(
+                sign_message, header, payload, self._keypairs[key_id]
+            )
+        return self._executor.submit(_sign_in_worker, header, payload, key_id)
+
+    def submit_many(self, jobs, chunksize=None):
+        # Jobs are dispatched in chunks so the per-task overhead, which dominates
+        # for the process backend, is paid once per chunk instead of per message.
+        jobs = list(jobs)
+        for _, _, key_id in jobs:
+            if key_id not in self._key_ids:
+                raise KeyError(f"Unknown key id: {key_id}")
+
+        if chunksize is None:
+            chunksize = max(1, len(jobs) // (self.max_workers * 4))
+
+        futures = [Future() for _ in jobs]
+        for start in range(0, len(jobs), chunksize):
+            chunk = jobs[start : start + chunksize]
+            if self.backend == "thread":
+                chunk_future = self._executor.submit(_sign_chunk, chunk, self._keypairs)
+            else:
+                chunk_future = self._executor.submit(_sign_chunk, chunk)
+            chunk_futures = futures[start : start + chunksize]
+            chunk_future.add_done_callback(
+                lambda done, chunk_futures=chunk_futures: _resolve_chunk(
+                    done, chunk_futures
+                )
+            )
+        return futures
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
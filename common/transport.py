@@ -0,0 +1,129 @@
+"""
+HTTP transports for the REST clients.
+
+A transport sends one request and returns a response with status_code, headers,
+content, text and json(). The clients only talk to a transport, so the protocol
+underneath can be swapped:
+
+- RequestsTransport: HTTP/1.1 over a pooled requests.Session (the sync default).
+- HttpxTransport / AsyncHttpxTransport: httpx clients that multiplex concurrent
+  requests over a single HTTP/2 connection when http2=True. Both default to
+  HTTP/1.1, like the clients.
+
+HTTP/2 needs the optional h2 package (pip install "httpx[http2]"). Without it the
+httpx transports warn and fall back to HTTP/1.1. Over TLS the protocol is
+negotiated per connection, so servers without HTTP/2 are served over HTTP/1.1
+as well. Cleartext servers cannot negotiate; prior_knowledge=True talks HTTP/2 to
+them directly.
+
+    transport = HttpxTransport(JSON_HEADERS, http2=True)
+    client = PacificaRestClient(keypair, transport=transport)
+"""
+
+import time
+import warnings
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def http2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _resolve_http2(http2):
+    if http2 and not http2_available():
+        warnings.warn(
+            "HTTP/2 requested but the h2 package is not installed, "
+            "falling back to HTTP/1.1",
+            RuntimeWarning,
+            stacklevel=3,
+        )
+        return False
+    return http2
+
+
+def _stamp_first_byte(response):
+    # httpx runs response hooks once the headers are in, before the body is read
+    response.first_byte_at = time.perf_counter()
+
+
+async def _stamp_first_byte_async(response):
+    response.first_byte_at = time.perf_counter()
+
+
+def _limits(max_connections):
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+    )
+
+
+class RequestsTransport:
+    def __init__(self, headers=None, pool_connections=4, pool_maxsize=32):
+        # Connections stay open between requests (requests keeps them alive by
+        # default); pool_maxsize bounds the idle connections kept per host.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(headers or {})
+
+    def request(self, method, url, body=None, params=None, timeout=None):
+        return self.session.request(
+            method, url, data=body, params=params, timeout=timeout
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class HttpxTransport:
+    def __init__(
+        self, headers=None, http2=False, max_connections=32, prior_knowledge=False
+    ):
+        self.http2 = _resolve_http2(http2)
+        self.client = httpx.Client(
+            headers=headers,
+            http1=not (self.http2 and prior_knowledge),
+            http2=self.http2,
+            limits=_limits(max_connections),
+            event_hooks={"response": [_stamp_first_byte]},
+        )
+
+    def request(self, method, url, body=None, params=None, timeout=None):
+        return self.client.request(
+            method, url, content=body, params=params, timeout=timeout
+        )
+
+    def close(self):
+        self.client.close()
+
+
+class AsyncHttpxTransport:
+    def __init__(
+        self, headers=None, http2=False, max_connections=16, prior_knowledge=False
+    ):
+        self.http2 = _resolve_http2(http2)
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            http1=not (self.http2 and prior_knowledge),
+            http2=self.http2,
+            limits=_limits(max_connections),
+            event_hooks={"response": [_stamp_first_byte_async]},
+        )
+
+    async def request(self, method, url, body=None, params=None, timeout=None):
+        return await self.client.request(
+            method, url, content=body, params=params, timeout=timeout
+        )
+
+    async def close(self):
+        await self.client.aclose()
@@ -2,17 +2,84 @@ import json
 import base58
 import subprocess
 
+from solders.signature import Signature
+
+
+# Sorted keys and compact separators give the canonical form the server verifies
+# against. Building the encoder once lets every call go straight to the C encoder
+# instead of copying the payload through sort_json_keys first.
+CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+# Signature header type -> action type expected by /orders/batch
+BATCH_ACTION_TYPES = {
+    "create_order": "Create",
+    "cancel_order": "Cancel",
+}
+
 
 def sign_message(header, payload, keypair):
-    message = prepare_message(header, payload)
-    message_bytes = message.encode("utf-8")
+    message_bytes, signature = sign_message_bytes(header, payload, keypair)
+    return (message_bytes.decode("ascii"), signature)
+
+
+def sign_message_bytes(header, payload, keypair):
+    message_bytes = prepare_message_bytes(header, payload)
     signature = keypair.sign_message(message_bytes)
-    return (message, base58.b58encode(bytes(signature)).decode("ascii"))
+    return (message_bytes, encode_signature(signature))
+
+
+def encode_signature(signature):
+    # solders renders a Signature as base58 natively, which is much faster than the
+    # pure-Python base58 package. Raw signature bytes still go through base58.
+    if isinstance(signature, Signature):
+        return str(signature)
+    return base58.b58encode(bytes(signature)).decode("ascii")
+
+
+def sign_messages(headers, payloads, keypair):
+    if len(headers) != len(payloads):
+        raise ValueError("Headers and payloads must have the same length")
+
+    # Everything shared by the actions is resolved once instead of per signature
+    public_key = str(keypair.pubkey())
+    sign = keypair.sign_message
+
+    actions = []
+    for header, payload in zip(headers, payloads):
+        action_type = BATCH_ACTION_TYPES.get(header.get("type"))
+        if action_type is None:
+            raise ValueError(f"Unsupported batch action type: {header.get('type')}")
+
+        signature = sign(prepare_message_bytes(header, payload))
+        actions.append(
+            {
+                "type": action_type,
+                "data": {
+                    "account": public_key,
+                    "signature": encode_signature(signature),
+                    "timestamp": header["timestamp"],
+                    "expiry_window": header["expiry_window"],
+                    **payload,
+                },
+            }
+        )
+
+    return actions
 
 
 def sign_with_hardware_wallet(header, payload, hardware_wallet_path):
     message = prepare_message(header, payload)
 
+    try:
+        signature = sign_offchain_message(message, hardware_wallet_path)
+        return (message, signature)
+
+    except Exception as e:
+        print(f"Error signing with Ledger: {e}")
+        raise
+
+
+def sign_offchain_message(message, hardware_wallet_path):
     # Construct the solana CLI command
     cmd = [
         "solana",
@@ -22,25 +89,22 @@ def sign_with_hardware_wallet(header, payload, hardware_wallet_path):
         message,
     ]
 
-    try:
-        # Execute the command and get the signature
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=False)
-        if result.returncode != 0:
-            raise Exception(f"Ledger signing failed: {result.stderr}")
+    # Execute the command and get the signature
+    result = subprocess.run(cmd, capture_output=True, text=True, shell=False)
+    if result.returncode != 0:
+        raise Exception(f"Ledger signing failed: {result.stderr}")
 
-        # The output contains both the approval message and the signature
-        # We need to extract just the signature (the last line)
-        output_lines = result.stdout.strip().split("\n")
-        signature = output_lines[-1]  # already in base58 ASCII format
+    # The output contains both the approval message and the signature
+    # We need to extract just the signature (the last line)
+    output_lines = result.stdout.strip().split("\n")
+    return output_lines[-1]  # already in base58 ASCII format
 
-        return (message, signature)
 
-    except Exception as e:
-        print(f"Error signing with Ledger: {e}")
-        raise
+def prepare_message(header, payload):
+    return prepare_message_bytes(header, payload).decode("ascii")
 
 
-def prepare_message(header, payload):
+def prepare_message_bytes(header, payload):
     if (
         "type" not in header
         or "timestamp" not in header
@@ -53,12 +117,13 @@ def prepare_message(header, payload):
         "data": payload,
     }
 
-    message = sort_json_keys(data)
+    return encode_canonical(data)
 
-    # Specifying the separaters is important because the JSON message is expected to be compact.
-    message = json.dumps(message, separators=(",", ":"))
 
-    return message
+def encode_canonical(value):
+    # The encoder escapes every non-ASCII character, so the output is always ASCII
+    # and byte-identical to json.dumps(sort_json_keys(value), separators=(",", ":")).
+    return CANONICAL_ENCODER.encode(value).encode("ascii")
 
 
 def sort_json_keys(value):
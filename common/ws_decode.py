@@ -0,0 +1,101 @@
+"""
+Decoding of WebSocket frames, optionally off the event loop.
+
+On a busy feed, decoding every frame with json.loads on the event loop competes
+with everything else on it, including order submission. FrameDecoder picks the
+JSON backend (orjson when installed, else json, or any name in JSON_BACKENDS)
+and where decoding runs:
+
+- inline: on the event loop, the cheapest per frame
+- process: in worker processes, which decode in parallel. The decoded message is
+  pickled back and unpickled in this process while holding the GIL, which costs
+  about as much as decoding JSON. So the loop still pays for every frame, and
+  bench/ws_decode.py shows no lower loop lag than inline with 50 KB frames on one
+  core. Measure before using it. Workers are spawned rather than forked, so they
+  do not inherit the process's sockets and threads.
+
+Frames smaller than offload_threshold bytes are decoded inline in every mode,
+since handing them off costs more than decoding them. submit() returns futures
+that the caller awaits in arrival order, so messages keep their order.
+
+A client that creates its own FrameDecoder closes it in close(). A decoder passed
+in belongs to the caller, who closes it, so one decoder can serve several clients.
+
+    decoder = FrameDecoder(mode="process", offload_threshold=16_384)
+    client = SubscriptionClient(on_message=handle, decoder=decoder)
+    ...
+    await client.close()
+    decoder.close()
+"""
+
+import asyncio
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # optional fast path
+    orjson = None
+
+
+JSON_BACKENDS = {"json": json.loads}
+if orjson is not None:
+    JSON_BACKENDS["orjson"] = orjson.loads
+
+DEFAULT_BACKEND = "orjson" if orjson is not None else "json"
+# There is no thread mode: json and orjson hold the GIL for the whole decode, so a
+# worker thread would stall the loop just as long as decoding inline
+MODES = ("inline", "process")
+
+
+def decode_frame(backend, frame):
+    # Module level so process workers can run it
+    return JSON_BACKENDS[backend](frame)
+
+
+class FrameDecoder:
+    def __init__(
+        self, backend=DEFAULT_BACKEND, mode="inline", max_workers=1, offload_threshold=0
+    ):
+        if backend not in JSON_BACKENDS:
+            raise ValueError(
+                f"Unknown JSON backend {backend!r}, expected one of "
+                f"{sorted(JSON_BACKENDS)}"
+            )
+        if mode not in MODES:
+            raise ValueError(f"Unknown decode mode {mode!r}, expected one of {MODES}")
+
+        self.backend = backend
+        self.mode = mode
+        self.offload_threshold = offload_threshold
+        self.loads = JSON_BACKENDS[backend]
+
+        if mode == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._executor = None
+
+    @property
+    def inline(self):
+        return self._executor is None
+
+    def decode(self, frame):
+        return self.loads(frame)
+
+    def submit(self, frame):
+        loop = asyncio.get_running_loop()
+        if self._executor is None or len(frame) < self.offload_threshold:
+            future = loop.create_future()
+            try:
+                future.set_result(self.loads(frame))
+            except ValueError as e:
+                future.set_exception(e)
+            return future
+        return loop.run_in_executor(self._executor, decode_frame, self.backend, frame)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,252 @@
+"""
+Many subscriptions over one WebSocket, routed per channel and symbol.
+
+SubscriptionMux runs a single SubscriptionClient (so it reconnects and
+resubscribes on its own) and hands each decoded message to the routes registered
+for its channel. The lookup is a few dict accesses per message. Routes can also be
+scoped to a symbol. For channels whose data is a list of per-symbol entries, such
+as "prices", a symbol route receives only its own entry.
+
+Routes whose params name an account receive only that account's messages. The
+account is read from the message ("account", or "account"/"u" on its data). A
+message that does not name one goes to the channel's account routes only when
+they all belong to one account; otherwise it is counted in mux.unrouted.
+
+Every route has its own bounded queue, and dispatch never waits on a consumer. A
+route with a handler drains its queue in its own task, so a slow handler only
+delays itself. When a queue is full:
+
+- drop_oldest=True: the oldest message is dropped and counted in route.dropped.
+  For market data, the latest update matters more than a backlog.
+- otherwise (the default): new messages are dropped and counted until the queue
+  has room again, then a "gap" event (detail: (first drop, resumed) in
+  time.time() seconds) is sent to on_event with the route's params, as after a
+  reconnect, so the consumer can resync.
+
+    mux = SubscriptionMux(on_event=print)
+    await mux.subscribe(
+        {"source": "prices"}, handler=print, symbol="BTC", drop_oldest=True
+    )
+    trades = await mux.subscribe({"source": "account_twap_order_updates", ...})
+    asyncio.create_task(mux.run())
+    async for message in trades:
+        ...
+"""
+
+import asyncio
+import time
+
+from common.constants import WS_URL
+from common.ws_subscriptions import (
+    SubscriptionClient,
+    SubscriptionEvent,
+    subscription_key,
+)
+
+
+DEFAULT_MAXSIZE = 1_000
+
+
+def message_symbol(item):
+    if isinstance(item, dict):
+        return item.get("symbol") or item.get("s")
+    return None
+
+
+def message_account(message):
+    account = message.get("account")
+    if account is None:
+        data = message.get("data")
+        item = data[0] if isinstance(data, list) and data else data
+        if isinstance(item, dict):
+            account = item.get("account") or item.get("u")
+    return account
+
+
+class Route:
+    def __init__(
+        self,
+        mux,
+        params,
+        symbol=None,
+        handler=None,
+        maxsize=DEFAULT_MAXSIZE,
+        drop_oldest=False,
+    ):
+        self.mux = mux
+        self.params = params
+        self.channel = params.get("source")
+        self.account = params.get("account")
+        self.symbol = symbol
+        self.handler = handler
+        self.drop_oldest = drop_oldest
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+        self.errors = 0
+        self._dropping_since = None  # time.time() of the first drop of a gap
+        self.task = None
+        if handler is not None:
+            self.task = asyncio.get_running_loop().create_task(self._consume())
+
+    def put(self, message):
+        if self.queue.full():
+            self.dropped += 1
+            if not self.drop_oldest:
+                if self._dropping_since is None:
+                    self._dropping_since = time.time()
+                return
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+        if self._dropping_since is not None:
+            gap = (self._dropping_since, time.time())
+            self._dropping_since = None
+            self.mux._emit("gap", self.params, gap)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    async def _consume(self):
+        is_coroutine = asyncio.iscoroutinefunction(self.handler)
+        while True:
+            message = await self.queue.get()
+            try:
+                if is_coroutine:
+                    await self.handler(message)
+                else:
+                    self.handler(message)
+            except Exception:
+                # One bad message must not stop the route
+                self.errors += 1
+
+    async def close(self):
+        await self.mux.unsubscribe(self)
+
+
+class SubscriptionMux:
+    def __init__(self, url=WS_URL, on_event=None, client=None, **client_options):
+        if client is None:
+            client = SubscriptionClient(url=url, on_event=on_event, **client_options)
+        self.client = client
+        self.client.on_message = self.dispatch
+
+        # The account key is None for routes that take every message
+        self._routes = {}  # channel -> {account: [Route]} for whole messages
+        self._symbol_routes = {}  # channel -> {account: {symbol: [Route]}}
+        self._accounts = {}  # channel -> {account: account-scoped routes}
+        self._refcounts = {}  # subscription_key -> routes using the subscription
+        self.unrouted = 0
+
+    def _emit(self, kind, params=None, detail=None):
+        if self.client.on_event is not None:
+            self.client.on_event(SubscriptionEvent(kind, params, detail))
+
+    async def subscribe(
+        self,
+        params,
+        handler=None,
+        symbol=None,
+        maxsize=DEFAULT_MAXSIZE,
+        drop_oldest=False,
+    ):
+        route = Route(self, params, symbol, handler, maxsize, drop_oldest)
+        if symbol is None:
+            accounts = self._routes.setdefault(route.channel, {})
+            accounts.setdefault(route.account, []).append(route)
+        else:
+            accounts = self._symbol_routes.setdefault(route.channel, {})
+            symbols = accounts.setdefault(route.account, {})
+            symbols.setdefault(symbol, []).append(route)
+        if route.account is not None:
+            counts = self._accounts.setdefault(route.channel, {})
+            counts[route.account] = counts.get(route.account, 0) + 1
+
+        # The exchange sees each distinct subscription once
+        key = subscription_key(params)
+        self._refcounts[key] = self._refcounts.get(key, 0) + 1
+        if self._refcounts[key] == 1:
+            await self.client.subscribe(params)
+        return route
+
+    async def unsubscribe(self, route):
+        if route.symbol is None:
+            routes = self._routes.get(route.channel, {}).get(route.account, [])
+        else:
+            symbols = self._symbol_routes.get(route.channel, {}).get(route.account, {})
+            routes = symbols.get(route.symbol, [])
+        if route not in routes:
+            return
+        routes.remove(route)
+        if route.task is not None:
+            route.task.cancel()
+        if route.account is not None:
+            counts = self._accounts[route.channel]
+            counts[route.account] -= 1
+            if not counts[route.account]:
+                del counts[route.account]
+
+        key = subscription_key(route.params)
+        self._refcounts[key] -= 1
+        if not self._refcounts[key]:
+            del self._refcounts[key]
+            await self.client.unsubscribe(route.params)
+
+    def dispatch(self, message):
+        if not isinstance(message, dict):
+            self.unrouted += 1
+            return
+        channel = message.get("channel")
+        routes = self._routes.get(channel)
+        symbol_routes = self._symbol_routes.get(channel)
+        if not routes and not symbol_routes:
+            self.unrouted += 1
+            return
+
+        scopes = (None,)
+        accounts = self._accounts.get(channel)
+        if accounts:
+            account = message_account(message)
+            if account is None and len(accounts) == 1:
+                # Only one account is subscribed, so the message is its own
+                account = next(iter(accounts))
+            if account is not None:
+                scopes = (None, account)
+
+        delivered = False
+        for scope in scopes:
+            for route in routes.get(scope, ()) if routes else ():
+                route.put(message)
+                delivered = True
+            symbols = symbol_routes.get(scope) if symbol_routes else None
+            if symbols:
+                data = message.get("data")
+                items = data if isinstance(data, list) else (data,)
+                for item in items:
+                    for route in symbols.get(message_symbol(item), ()):
+                        route.put({"channel": channel, "data": item})
+                        delivered = True
+        if not delivered:
+            self.unrouted += 1
+
+    async def run(self):
+        await self.client.run()
+
+    async def close(self):
+        # Closes the client, which shuts down its decoder unless one was passed in
+        for accounts in self._routes.values():
+            for routes in accounts.values():
+                for route in routes:
+                    if route.task is not None:
+                        route.task.cancel()
+        for accounts in self._symbol_routes.values():
+            for symbols in accounts.values():
+                for routes in symbols.values():
+                    for route in routes:
+                        if route.task is not None:
+                            route.task.cancel()
+        await self.client.close()
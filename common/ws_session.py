@@ -0,0 +1,298 @@
+"""
+Long-lived WebSocket trading session.
+
+The ws/ examples open a connection per order and block on a single recv(), so
+every order pays for the TCP, TLS and WebSocket handshakes. WsTradingSession
+connects once and sends any number of signed requests over the same socket. Each
+request carries a unique "id". A reader task matches every reply to the future
+waiting on that id, so requests from many coroutines can share the session at the
+same time. Messages without a pending id go to on_message, if one is given.
+The server time "t" of every reply, with the request's send and receive times,
+feeds the clock that timestamps the signed requests.
+
+    async with WsTradingSession(keypair) as session:
+        reply = await session.create_order(
+            {
+                "symbol": "BTC",
+                "price": "100000",
+                "reduce_only": False,
+                "amount": "0.1",
+                "side": "bid",
+                "tif": "GTC",
+                "client_order_id": client_order_ids.allocate(),
+            }
+        )
+        await session.cancel_order(
+            {"symbol": "BTC", "order_id": reply["data"]["order_id"]}
+        )
+
+Replies are returned as decoded dicts, e.g. {"code": 200, "data": {...}, "id": ...}.
+Errors are replies too; only transport failures and timeouts raise. Frames that are
+not JSON are skipped and counted in decode_errors, and exceptions from on_message
+in callback_errors, so neither stops the replies to pending requests. If reading
+fails otherwise, the session closes its socket and fails everything pending.
+
+Pipelining: send() returns as soon as the request is on the wire, with a future for
+its reply, so one coroutine can keep many requests in flight instead of waiting a
+round trip for each. max_in_flight bounds the unanswered requests. When the window
+is full, send() waits for a reply (or a timeout) to free a slot, which pushes back
+on the submitter. Requests go out in the order send() was called, so e.g. a cancel
+submitted after its create reaches the exchange after it. Every request has its
+own timeout, counted from when it was sent; an expired request frees its slot and
+its future raises asyncio.TimeoutError.
+
+    async with WsTradingSession(keypair, max_in_flight=32) as session:
+        futures = [await session.send("create_order", p) for p in payloads]
+        replies = await asyncio.gather(*futures)
+"""
+
+import asyncio
+import json
+import time
+import uuid
+
+import websockets
+
+from common import instrumentation
+from common.clock import local_time_ms, server_clock
+from common.constants import WS_URL
+from common.keystore import KeyEntry
+from common.rest_client import DEFAULT_EXPIRY_WINDOW, build_signed_request
+
+
+DEFAULT_TIMEOUT = 10
+
+
+def ws_endpoint(message_type):
+    # Instrumentation label for a WebSocket request
+    return f"ws:{message_type}"
+
+
+class PendingRequest:
+    __slots__ = ("future", "message_type", "sent_at", "sent_at_ms", "timer")
+
+    def __init__(self, future, message_type, sent_at, sent_at_ms, timer):
+        self.future = future
+        self.message_type = message_type
+        self.sent_at = sent_at  # time.perf_counter(), for instrumentation
+        self.sent_at_ms = sent_at_ms  # local_time_ms(), for the server clock
+        self.timer = timer
+
+
+class WsTradingSession:
+    def __init__(
+        self,
+        keypair,
+        account=None,
+        url=WS_URL,
+        clock=None,
+        expiry_window=DEFAULT_EXPIRY_WINDOW,
+        timeout=DEFAULT_TIMEOUT,
+        max_in_flight=None,
+        on_message=None,
+        ping_interval=30,
+    ):
+        self.key = KeyEntry("default", keypair, account)
+        self.url = url
+        self.clock = server_clock if clock is None else clock
+        self.expiry_window = expiry_window
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.on_message = on_message
+        self.ping_interval = ping_interval
+
+        self.websocket = None
+        self._pending = {}  # id -> PendingRequest
+        self._reader = None
+        # asyncio.Lock wakes waiters in FIFO order, which keeps submission order
+        # while callers queue up for a slot
+        self._submit_lock = asyncio.Lock()
+        self._window = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+        self.timeouts = 0
+        self.decode_errors = 0
+        self.callback_errors = 0
+
+    async def connect(self):
+        if self.websocket is None:
+            self.websocket = await websockets.connect(
+                self.url, ping_interval=self.ping_interval
+            )
+            self._reader = asyncio.get_running_loop().create_task(self._read())
+        return self
+
+    async def close(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+        if self._reader is not None:
+            await self._reader
+        self.websocket = None
+        self._reader = None
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def in_flight(self):
+        return len(self._pending)
+
+    # ---------------------------------------------------------------
+    # Requests
+    # ---------------------------------------------------------------
+
+    def build_message(self, message_type, payload, request_id=None):
+        request = build_signed_request(
+            self.key,
+            message_type,
+            payload,
+            self.clock,
+            self.expiry_window,
+            endpoint=ws_endpoint(message_type),
+        )
+        return {
+            "id": request_id or str(uuid.uuid4()),
+            "params": {message_type: request},
+        }
+
+    async def send(self, message_type, payload, timeout=None):
+        # Sends the request and returns the future of its reply without waiting
+        timeout = self.timeout if timeout is None else timeout
+        recorder = instrumentation.recorder
+        if recorder is not None:
+            queued = time.perf_counter()
+
+        async with self._submit_lock:
+            if self._window is not None:
+                await self._window.acquire()
+            if recorder is not None:
+                recorder.record(
+                    ws_endpoint(message_type), "queue", time.perf_counter() - queued
+                )
+            return await self._send(message_type, payload, timeout)
+
+    async def _send(self, message_type, payload, timeout):
+        try:
+            if self.websocket is None:
+                raise RuntimeError("WsTradingSession is not connected")
+            # Signed only once a slot is free, so waiting does not use up the expiry
+            message = self.build_message(message_type, payload)
+            text = json.dumps(message)
+        except BaseException:
+            self._release()
+            raise
+
+        request_id = message["id"]
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Registered before sending, since the reply can arrive while send() yields
+        timer = loop.call_later(timeout, self._expire, request_id)
+        self._pending[request_id] = PendingRequest(
+            future, message_type, time.perf_counter(), local_time_ms(), timer
+        )
+        try:
+            await self.websocket.send(text)
+        except BaseException:
+            self._finish(request_id)
+            raise
+        return future
+
+    async def request(self, message_type, payload, timeout=None):
+        return await (await self.send(message_type, payload, timeout))
+
+    def create_order(self, payload, timeout=None):
+        return self.request("create_order", payload, timeout)
+
+    def create_market_order(self, payload, timeout=None):
+        return self.request("create_market_order", payload, timeout)
+
+    def cancel_order(self, payload, timeout=None):
+        return self.request("cancel_order", payload, timeout)
+
+    def cancel_all_orders(
+        self, all_symbols=True, exclude_reduce_only=False, timeout=None, **extra
+    ):
+        payload = {
+            "all_symbols": all_symbols,
+            "exclude_reduce_only": exclude_reduce_only,
+            **extra,
+        }
+        return self.request("cancel_all_orders", payload, timeout)
+
+    # ---------------------------------------------------------------
+    # Replies
+    # ---------------------------------------------------------------
+
+    def _release(self):
+        if self._window is not None:
+            self._window.release()
+
+    def _finish(self, request_id):
+        # Removes a pending request and frees its slot, exactly once
+        pending = self._pending.pop(request_id, None)
+        if pending is not None:
+            pending.timer.cancel()
+            self._release()
+        return pending
+
+    def _expire(self, request_id):
+        # A late reply for this id is then handed to on_message
+        pending = self._finish(request_id)
+        if pending is not None and not pending.future.done():
+            self.timeouts += 1
+            pending.future.set_exception(
+                asyncio.TimeoutError(f"No reply to {pending.message_type} {request_id}")
+            )
+
+    async def _read(self):
+        error = None
+        try:
+            async for text in self.websocket:
+                self._dispatch(text)
+        except Exception as e:
+            error = e
+            # Replies can no longer be matched, so the socket must not take requests
+            await self.websocket.close()
+        finally:
+            # Nothing still pending can be answered on a closed socket
+            error = ConnectionError(f"WebSocket closed: {error or 'connection closed'}")
+            for request_id in list(self._pending):
+                pending = self._finish(request_id)
+                if not pending.future.done():
+                    pending.future.set_exception(error)
+
+    def _dispatch(self, text):
+        received_at_ms = local_time_ms()
+        recorder = instrumentation.recorder
+        if recorder is not None:
+            started = time.perf_counter()
+        try:
+            message = json.loads(text)
+        except ValueError:
+            self.decode_errors += 1
+            return
+
+        pending = None
+        if isinstance(message, dict):
+            pending = self._finish(message.get("id"))
+        if pending is None:
+            if self.on_message is not None:
+                try:
+                    self.on_message(message)
+                except Exception:
+                    # A consumer bug must not stop the replies to other requests
+                    self.callback_errors += 1
+            return
+
+        # Replies carry the server time in "t", which keeps the clock in sync
+        server_time_ms = message.get("t")
+        if isinstance(server_time_ms, (int, float)):
+            self.clock.observe(server_time_ms, pending.sent_at_ms, received_at_ms)
+
+        if recorder is not None:
+            endpoint = ws_endpoint(pending.message_type)
+            recorder.record(endpoint, "send", started - pending.sent_at)
+            recorder.record(endpoint, "decode", time.perf_counter() - started)
+        if not pending.future.done():
+            pending.future.set_result(message)
@@ -0,0 +1,297 @@
+"""
+Self-healing WebSocket subscriptions.
+
+ws/subscribe_prices.py and ws/subscribe_twap.py stop at the first disconnect.
+SubscriptionClient remembers the params of every active subscription ("prices",
+"account_twap_orders", "account_twap_order_updates", ...). When the connection
+drops, it reconnects with jittered exponential backoff and subscribes to all of
+them again.
+
+Messages that may have been missed are reported as events rather than hidden, so
+caches built from the stream can resync (e.g. by fetching a snapshot over REST):
+
+- disconnected: the connection was lost (detail: the error)
+- connected: (re)connected and every subscription was sent again
+- gap: a subscription may have missed messages between two times (detail: (last
+  message before the drop, resubscribed) in time.time() seconds); one per
+  subscription after every reconnect
+- stall: no message on a subscribed channel for stall_timeout seconds (detail:
+  seconds since the last one), reported once until the channel is live again
+- callback_error: on_message raised (detail: the exception). The message is
+  skipped and the connection stays up; the count is kept in callback_errors.
+
+Connections that drop within STABLE_CONNECTION seconds of opening keep
+escalating the backoff, so a server that accepts and then drops connections is
+not hammered.
+
+A dead connection is detected by the websockets keepalive pings. A connection
+that is alive but stuck can be replaced with reconnect(), e.g. from a stall event.
+
+    client = SubscriptionClient(on_message=print, on_event=print, stall_timeout=30)
+    await client.subscribe({"source": "prices"})
+    await client.run()
+
+Frames are decoded by a FrameDecoder (common/ws_decode.py): inline with the
+fastest JSON backend by default, or in worker processes.
+Undecodable frames are skipped and counted in decode_errors. close() shuts down
+the default decoder; a decoder passed in is left to the caller.
+"""
+
+import asyncio
+import json
+import random
+import time
+
+import websockets
+
+from common.constants import WS_URL
+from common.ws_decode import FrameDecoder
+
+
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+# Seconds a connection must stay up before the backoff starts over
+STABLE_CONNECTION = 10.0
+# Frames read ahead of the dispatcher while they are decoded off the loop
+DECODE_QUEUE_SIZE = 256
+
+
+def subscription_key(params):
+    # Subscriptions are identified by their params, independent of key order
+    return json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF, maximum=DEFAULT_MAX_BACKOFF):
+    # "Full jitter": uniform in [0, min(maximum, base * 2**attempt)], so clients
+    # dropped together do not reconnect in lockstep
+    return random.uniform(0, min(maximum, base * 2**attempt))
+
+
+class SubscriptionEvent:
+    __slots__ = ("kind", "params", "detail", "time")
+
+    def __init__(self, kind, params=None, detail=None):
+        self.kind = kind
+        self.params = params
+        self.detail = detail
+        self.time = time.time()
+
+    def __repr__(self):
+        return (
+            f"SubscriptionEvent(kind={self.kind!r}, params={self.params!r}, "
+            f"detail={self.detail!r})"
+        )
+
+
+class SubscriptionClient:
+    def __init__(
+        self,
+        url=WS_URL,
+        on_message=None,
+        on_event=None,
+        backoff=DEFAULT_BACKOFF,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        stall_timeout=None,
+        ping_interval=30,
+        decoder=None,
+    ):
+        self.url = url
+        self.on_message = on_message
+        self.on_event = on_event
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stall_timeout = stall_timeout
+        self.ping_interval = ping_interval
+        self._owns_decoder = decoder is None
+        self.decoder = FrameDecoder() if decoder is None else decoder
+
+        self.websocket = None
+        self.subscriptions = {}  # subscription_key -> params
+        self.reconnects = 0
+        self.decode_errors = 0
+        self.callback_errors = 0
+        self._last_message = {}  # source -> time.monotonic() of the last message
+        self._stalled = set()
+        self._last_received = None  # time.time() of the last message
+        self._down_since = None
+        self._closed = False
+
+    # ---------------------------------------------------------------
+    # Subscriptions
+    # ---------------------------------------------------------------
+
+    async def _send(self, method, params):
+        if self.websocket is not None:
+            try:
+                await self.websocket.send(
+                    json.dumps({"method": method, "params": params})
+                )
+            except websockets.ConnectionClosed:
+                # Replayed by the reconnect
+                pass
+
+    async def subscribe(self, params):
+        self.subscriptions[subscription_key(params)] = params
+        self._last_message.setdefault(params.get("source"), time.monotonic())
+        await self._send("subscribe", params)
+
+    async def unsubscribe(self, params):
+        if self.subscriptions.pop(subscription_key(params), None) is not None:
+            await self._send("unsubscribe", params)
+
+    def _emit(self, kind, params=None, detail=None):
+        if self.on_event is not None:
+            self.on_event(SubscriptionEvent(kind, params, detail))
+
+    # ---------------------------------------------------------------
+    # Connection
+    # ---------------------------------------------------------------
+
+    async def run(self):
+        # Runs until close(); reconnects whenever the connection is lost
+        attempt = 0
+        while not self._closed:
+            try:
+                self.websocket = await websockets.connect(
+                    self.url, ping_interval=self.ping_interval
+                )
+            except (OSError, websockets.WebSocketException) as e:
+                self._emit("disconnected", detail=e)
+                await asyncio.sleep(
+                    backoff_delay(attempt, self.backoff, self.max_backoff)
+                )
+                attempt += 1
+                continue
+
+            connected_at = time.monotonic()
+            error = await self._session()
+            # The socket may still be open, e.g. after the watchdog or a read error
+            websocket, self.websocket = self.websocket, None
+            await websocket.close()
+            if self._closed:
+                break
+            self._down_since = self._last_received or time.time()
+            self.reconnects += 1
+            self._emit("disconnected", detail=error)
+
+            if time.monotonic() - connected_at >= STABLE_CONNECTION:
+                attempt = 0
+            await asyncio.sleep(backoff_delay(attempt, self.backoff, self.max_backoff))
+            attempt += 1
+
+    async def _session(self):
+        for params in list(self.subscriptions.values()):
+            await self._send("subscribe", params)
+        # Channels get a fresh stall_timeout from the (re)subscription
+        now = time.monotonic()
+        for source in self._last_message:
+            self._last_message[source] = now
+        self._stalled.clear()
+
+        self._emit("connected")
+        if self._down_since is not None:
+            gap = (self._down_since, time.time())
+            for params in list(self.subscriptions.values()):
+                self._emit("gap", params, gap)
+            self._down_since = None
+
+        watchdog = None
+        if self.stall_timeout:
+            watchdog = asyncio.get_running_loop().create_task(self._watch())
+        try:
+            if self.decoder.inline:
+                await self._read_inline()
+            else:
+                await self._read_offloaded()
+        except Exception as e:
+            return e
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+        return None
+
+    async def _read_inline(self):
+        decode = self.decoder.decode
+        async for frame in self.websocket:
+            self._last_received = time.time()
+            try:
+                message = decode(frame)
+            except ValueError:
+                self.decode_errors += 1
+                continue
+            self._dispatch(message)
+
+    async def _read_offloaded(self):
+        # The reader hands frames to the decoder as they arrive and the dispatcher
+        # awaits the results in arrival order. Whichever stops first ends both.
+        loop = asyncio.get_running_loop()
+        decoded = asyncio.Queue(DECODE_QUEUE_SIZE)
+        reader = loop.create_task(self._read_frames(decoded))
+        dispatcher = loop.create_task(self._dispatch_decoded(decoded))
+        try:
+            done, _ = await asyncio.wait(
+                (reader, dispatcher), return_when=asyncio.FIRST_COMPLETED
+            )
+            if dispatcher in done:
+                dispatcher.result()
+            reader.result()
+            # Deliver what was read before the connection closed
+            await decoded.put(None)
+            await dispatcher
+        finally:
+            reader.cancel()
+            dispatcher.cancel()
+
+    async def _read_frames(self, decoded):
+        async for frame in self.websocket:
+            self._last_received = time.time()
+            await decoded.put(self.decoder.submit(frame))
+
+    async def _dispatch_decoded(self, decoded):
+        while True:
+            future = await decoded.get()
+            if future is None:
+                return
+            try:
+                message = await future
+            except ValueError:
+                self.decode_errors += 1
+                continue
+            self._dispatch(message)
+
+    def _dispatch(self, message):
+        if isinstance(message, dict):
+            source = message.get("channel")
+            self._last_message[source] = time.monotonic()
+            self._stalled.discard(source)
+        if self.on_message is not None:
+            try:
+                self.on_message(message)
+            except Exception as e:
+                # A consumer bug is not a lost connection
+                self.callback_errors += 1
+                self._emit("callback_error", detail=e)
+
+    async def _watch(self):
+        interval = self.stall_timeout / 4
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for params in list(self.subscriptions.values()):
+                source = params.get("source")
+                last = self._last_message.get(source, now)
+                if now - last > self.stall_timeout and source not in self._stalled:
+                    self._stalled.add(source)
+                    self._emit("stall", params, now - last)
+
+    async def reconnect(self):
+        # Drops the current connection; run() connects again and resubscribes
+        if self.websocket is not None:
+            await self.websocket.close()
+
+    async def close(self):
+        self._closed = True
+        if self.websocket is not None:
+            await self.websocket.close()
+        if self._owns_decoder:
+            self.decoder.close()
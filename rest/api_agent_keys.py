@@ -4,18 +4,13 @@ to an account and use the api agent key to sign on behalf of the account
 to create a market order.
 """
 
-import time
 import uuid
 
-import requests
 from solders.keypair import Keypair
 
-from common.constants import REST_URL
-from common.utils import sign_message
+from common.rest_client import PacificaRestClient
 
 
-BIND_AGENT_WALLET_API_URL = f"{REST_URL}/agent/bind"
-MARKET_ORDER_API_URL = f"{REST_URL}/orders/create_market"
 PRIVATE_KEY = ""  # e.g. "2Z2Wn4kN5ZNhZzuFTQSyTiN4ixX8U6ew5wPDJbHngZaC3zF3uWNj4dQ63cnGfXpw1cESZPCqvoZE7VURyuj9kf8b"
 
 
@@ -32,67 +27,24 @@ def main():
     # Bind agent wallet
     # ---------------------------------------------------------------
 
-    # Scaffold the signature header
-    timestamp = int(time.time() * 1_000)
-
-    signature_header = {
-        "timestamp": timestamp,
-        "expiry_window": 5_000,
-        "type": "bind_agent_wallet",
-    }
-
-    # Construct the signature payload
-    signature_payload = {
-        "agent_wallet": agent_wallet_public_key,
-    }
-
-    # Use the helper function to sign the message
-    message, signature = sign_message(signature_header, signature_payload, keypair)
-
-    # Construct the request reusing the payload and constructing common request fields
-    request_header = {
-        "account": public_key,
-        "signature": signature,
-        "timestamp": signature_header["timestamp"],
-        "expiry_window": signature_header["expiry_window"],
-    }
-
-    # Send the request
-    headers = {"Content-Type": "application/json"}
-
-    request = {
-        **request_header,
-        **signature_payload,
-    }
-
-    response = requests.post(BIND_AGENT_WALLET_API_URL, json=request, headers=headers)
+    # The account's own key signs the bind request
+    with PacificaRestClient(keypair) as client:
+        response = client.bind_agent_wallet(agent_wallet_public_key)
     print(f"Status Code: {response.status_code}")
     print(f"Response: {response.text}")
-    print(f"Request: {request}")
 
     # Print details for debugging
     print("\nDebug Info:")
     print(f"Address: {public_key}")
     print(f"Agent Wallet: {agent_wallet_public_key}")
-    print(f"Message: {message}")
-    print(f"Signature: {signature}")
     print("\n")
 
     # ---------------------------------------------------------------
     # Create market order
     # ---------------------------------------------------------------
 
-    # Scaffold the signature header
-    timestamp = int(time.time() * 1_000)
-
-    signature_header = {
-        "timestamp": timestamp,
-        "expiry_window": 5_000,
-        "type": "create_market_order",
-    }
-
-    # Construct the signature payload
-    signature_payload = {
+    # Construct the payload
+    payload = {
         "symbol": "BTC",
         "reduce_only": False,
         "amount": "0.1",
@@ -101,38 +53,17 @@ def main():
         "client_order_id": str(uuid.uuid4()),
     }
 
-    # Use the helper function to sign the message, with the agent wallet's private key
-    message, signature = sign_message(
-        signature_header, signature_payload, agent_wallet_private_key
-    )
-
-    # Construct the request reusing the payload and constructing common request fields
-    request_header = {
-        "account": public_key,
-        "agent_wallet": agent_wallet_public_key,  # use the agent wallet's public key
-        "signature": signature,
-        "timestamp": signature_header["timestamp"],
-        "expiry_window": signature_header["expiry_window"],
-    }
-
-    # Send the request
-    headers = {"Content-Type": "application/json"}
-
-    request = {
-        **request_header,
-        **signature_payload,
-    }
-
-    response = requests.post(MARKET_ORDER_API_URL, json=request, headers=headers)
+    # Sign with the agent wallet's private key on behalf of the account. The client
+    # sends the account and adds the agent wallet's public key to the request.
+    with PacificaRestClient(agent_wallet_private_key, account=public_key) as client:
+        response = client.create_market_order(payload)
     print(f"Status Code: {response.status_code}")
     print(f"Response: {response.text}")
-    print(f"Request: {request}")
 
     # Print details for debugging
     print("\nDebug Info:")
     print(f"Address: {public_key}")
-    print(f"Message: {message}")
-    print(f"Signature: {signature}")
+    print(f"Agent Wallet: {client.key.public_key}")
 
 
 if __name__ == "__main__":
@@ -1,65 +1,31 @@
-import time
-
-import requests
 from solders.keypair import Keypair
 
-from common.constants import REST_URL
-from common.utils import sign_message
+from common.rest_client import PacificaRestClient
 
 
-API_URL = f"{REST_URL}/orders/twap/cancel"
 PRIVATE_KEY = ""  # e.g. "2Z2Wn4kN5ZNhZzuFTQSyTiN4ixX8U6ew5wPDJbHngZaC3zF3uWNj4dQ63cnGfXpw1cESZPCqvoZE7VURyuj9kf8b"
 
 
 def main():
     # Generate account based on private key
     keypair = Keypair.from_base58_string(PRIVATE_KEY)
-    public_key = str(keypair.pubkey())
-
-    # Scaffold the signature header
-    timestamp = int(time.time() * 1_000)
 
-    signature_header = {
-        "timestamp": timestamp,
-        "expiry_window": 5_000,
-        "type": "cancel_twap_order",
-    }
-
-    # Construct the signature payload
-    signature_payload = {
+    # Construct the payload
+    payload = {
         "symbol": "BTC",
         "order_id": 3,  # or "client_order_id": "xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx"
     }
 
-    # Use the helper function to sign the message
-    message, signature = sign_message(signature_header, signature_payload, keypair)
-
-    # Construct the request reusing the payload and constructing common request fields
-    request_header = {
-        "account": public_key,
-        "signature": signature,
-        "timestamp": signature_header["timestamp"],
-        "expiry_window": signature_header["expiry_window"],
-    }
-
-    # Send the request
-    headers = {"Content-Type": "application/json"}
-
-    request = {
-        **request_header,
-        **signature_payload,
-    }
-
-    response = requests.post(API_URL, json=request, headers=headers)
+    # The client signs the payload and adds the account, signature, timestamp and
+    # expiry window, reusing one keep-alive connection for every request
+    with PacificaRestClient(keypair) as client:
+        response = client.cancel_twap_order(payload)
     print(f"Status Code: {response.status_code}")
     print(f"Response: {response.text}")
-    print(f"Request: {request}")
 
     # Print details for debugging
     print("\nDebug Info:")
-    print(f"Address: {public_key}")
-    print(f"Message: {message}")
-    print(f"Signature: {signature}")
+    print(f"Address: {client.key.public_key}")
 
 
 if __name__ == "__main__":
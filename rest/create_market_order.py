@@ -1,70 +1,41 @@
-import time
-import uuid
-
-import requests
 from solders.keypair import Keypair
 
-from common.constants import REST_URL
-from common.utils import sign_message
+from common.order_ids import client_order_ids
+from common.rest_client import PacificaRestClient
 
 
-API_URL = f"{REST_URL}/orders/create_market"
 PRIVATE_KEY = ""  # e.g. "2Z2Wn4kN5ZNhZzuFTQSyTiN4ixX8U6ew5wPDJbHngZaC3zF3uWNj4dQ63cnGfXpw1cESZPCqvoZE7VURyuj9kf8b"
 
 
 def main():
     # Generate account based on private key
     keypair = Keypair.from_base58_string(PRIVATE_KEY)
-    public_key = str(keypair.pubkey())
-
-    # Scaffold the signature header
-    timestamp = int(time.time() * 1_000)
 
-    signature_header = {
-        "timestamp": timestamp,
-        "expiry_window": 5_000,
-        "type": "create_market_order",
-    }
+    # Allocate a client order id and remember what the order was for, so acks and
+    # updates carrying it can be resolved back to this intent
+    client_order_id = client_order_ids.allocate({"symbol": "BTC", "side": "bid"})
 
-    # Construct the signature payload
-    signature_payload = {
+    # Construct the payload
+    payload = {
         "symbol": "BTC",
         "reduce_only": False,
         "amount": "0.1",
         "side": "bid",
         "slippage_percent": "0.5",
-        "client_order_id": str(uuid.uuid4()),
-    }
-
-    # Use the helper function to sign the message
-    message, signature = sign_message(signature_header, signature_payload, keypair)
-
-    # Construct the request reusing the payload and constructing common request fields
-    request_header = {
-        "account": public_key,
-        "signature": signature,
-        "timestamp": signature_header["timestamp"],
-        "expiry_window": signature_header["expiry_window"],
-    }
-
-    # Send the request
-    headers = {"Content-Type": "application/json"}
-
-    request = {
-        **request_header,
-        **signature_payload,
+        "client_order_id": client_order_id,
     }
 
-    response = requests.post(API_URL, json=request, headers=headers)
+    # The client signs the payload and adds the account, signature, timestamp and
+    # expiry window, reusing one keep-alive connection for every request
+    with PacificaRestClient(keypair) as client:
+        response = client.create_market_order(payload)
     print(f"Status Code: {response.status_code}")
     print(f"Response: {response.text}")
-    print(f"Request: {request}")
 
     # Print details for debugging
     print("\nDebug Info:")
-    print(f"Address: {public_key}")
-    print(f"Message: {message}")
-    print(f"Signature: {signature}")
+    print(f"Address: {client.key.public_key}")
+    print(f"Order Intent: {client_order_ids.lookup(client_order_id)}")
 
 
 if __name__ == "__main__":
@@ -52,15 +52,11 @@ The authentication flow uses a cross-signature scheme to ensure that both the ma
    - If both verifications succeed, the subaccount relationship is established
 """
 
-import time
-
-import requests
 from solders.keypair import Keypair
 
-from common.constants import REST_URL
-from common.utils import sign_message
+from common.rest_client import PacificaRestClient
+
 
-API_URL = f"{REST_URL}/account/subaccount/create"
 MAIN_PRIVATE_KEY = ""
 SUB_PRIVATE_KEY = ""
 
@@ -71,67 +67,18 @@ def main():
     main_keypair = Keypair.from_base58_string(MAIN_PRIVATE_KEY)
     sub_keypair = Keypair.from_base58_string(SUB_PRIVATE_KEY)
 
-    # Generate a timestamp and expiry window
-    # Both signatures must have the same timestamp and expiry window.
-    timestamp = int(time.time() * 1_000)
-    expiry_window = 5_000
-
-    # Get public keys
-    main_public_key = str(main_keypair.pubkey())
-    sub_public_key = str(sub_keypair.pubkey())
-
-    # Step 1: Subaccount signs the main account's public key
-    subaccount_signature_header = {
-        "timestamp": timestamp,
-        "expiry_window": expiry_window,
-        "type": "subaccount_initiate",
-    }
-
-    payload = {"account": main_public_key}
-
-    subaccount_message, subaccount_signature = sign_message(
-        subaccount_signature_header, payload, sub_keypair
-    )
-
-    # Step 2: Main account signs the sub_signature
-    main_account_signature_header = {
-        "timestamp": timestamp,
-        "expiry_window": expiry_window,
-        "type": "subaccount_confirm",
-    }
-
-    payload = {"signature": subaccount_signature}
-
-    main_account_message, main_signature = sign_message(
-        main_account_signature_header, payload, main_keypair
-    )
-
-    # Step 3: Create and send the request
-    request = {
-        "main_account": main_public_key,
-        "subaccount": sub_public_key,
-        "main_signature": main_signature,
-        "sub_signature": subaccount_signature,
-        "timestamp": timestamp,
-        "expiry_window": expiry_window,
-    }
-
-    # Send the request
-    headers = {"Content-Type": "application/json"}
-
-    response = requests.post(API_URL, json=request, headers=headers)
+    # The client runs steps 1-3: the subaccount signs the main account's public
+    # key, the main account signs that signature, and both are sent with the same
+    # timestamp and expiry window
+    with PacificaRestClient(main_keypair) as client:
+        response = client.create_subaccount(sub_keypair)
     print(f"Status Code: {response.status_code}")
     print(f"Response: {response.text}")
-    print(f"Request: {request}")
 
     # Print details for debugging
     print("\nDebug Info:")
-    print(f"Main Account: {main_public_key}")
-    print(f"Main Message: {main_account_message}")
-    print(f"Main Signature: {main_signature}")
-    print(f"Sub Account: {sub_public_key}")
-    print(f"Sub Message: {subaccount_message}")
-    print(f"Sub Signature: {subaccount_signature}")
+    print(f"Main Account: {client.key.public_key}")
+    print(f"Sub Account: {sub_keypair.pubkey()}")
 
 
 if __name__ == "__main__":
@@ -5,11 +5,19 @@ import requests
 from solders.keypair import Keypair
 
 from common.constants import REST_URL
-from common.utils import sign_message, sign_with_hardware_wallet
+from common.hardware_wallet import (
+    HardwareSigningSession,
+    HelperProcessBackend,
+    SolanaCliBackend,
+)
+from common.utils import sign_message
 
 API_URL = f"{REST_URL}/account/subaccount/create"
 MAIN_HARDWARE_PUB_KEY = ""
 MAIN_HARDWARE_PATH = ""  # e.g. "usb://ledger?key=1"
+# Optional long-lived signer helper, e.g. ["ledger-signer", MAIN_HARDWARE_PATH];
+# empty signs through the solana CLI
+HARDWARE_SIGNER_CMD = []
 SUB_PRIVATE_KEY = ""
 
 
@@ -48,10 +56,16 @@ def main():
 
     payload = {"signature": subaccount_signature}
 
+    if HARDWARE_SIGNER_CMD:
+        backend = HelperProcessBackend(HARDWARE_SIGNER_CMD)
+    else:
+        backend = SolanaCliBackend(MAIN_HARDWARE_PATH)
+
     print("Signing with hardware wallet...")
-    main_account_message, main_signature = sign_with_hardware_wallet(
-        main_account_signature_header, payload, MAIN_HARDWARE_PATH
-    )
+    with HardwareSigningSession(backend) as session:
+        main_account_message, main_signature = session.sign(
+            main_account_signature_header, payload
+        )
 
     # Step 3: Create and send the request
     request = {
@@ -5,11 +5,18 @@ import requests
 from solders.keypair import Keypair
 
 from common.constants import REST_URL
-from common.utils import sign_with_hardware_wallet
+from common.hardware_wallet import (
+    HardwareSigningSession,
+    HelperProcessBackend,
+    SolanaCliBackend,
+)
 
 
 API_URL = f"{REST_URL}/account/subaccount/transfer"
 HARDWARE_PATH = ""  # e.g. "usb://ledger?key=1"
+# Optional long-lived signer helper, e.g. ["ledger-signer", HARDWARE_PATH];
+# empty signs through the solana CLI
+HARDWARE_SIGNER_CMD = []
 FROM_HARDWARE_PUB_KEY = ""  # must be a main account in hardware wallet
 TO_PUBLIC_KEY = ""  # must be the above's child subaccount
 
@@ -30,10 +37,14 @@ def main():
         "amount": "420.69",
     }
 
+    if HARDWARE_SIGNER_CMD:
+        backend = HelperProcessBackend(HARDWARE_SIGNER_CMD)
+    else:
+        backend = SolanaCliBackend(HARDWARE_PATH)
+
     print("Signing with hardware wallet...")
-    message, signature = sign_with_hardware_wallet(
-        signature_header, signature_payload, HARDWARE_PATH
-    )
+    with HardwareSigningSession(backend) as session:
+        message, signature = session.sign(signature_header, signature_payload)
 
     # Construct the request reusing the payload and constructing common request fields
     request_header = {
@@ -7,6 +7,7 @@ import websockets
 from solders.keypair import Keypair
 
 from common.constants import WS_URL
+from common.order_ids import client_order_ids
 from common.utils import sign_message
 
 PRIVATE_KEY = ""  # e.g. "2Z2Wn4kN5ZNhZzuFTQSyTiN4ixX8U6ew5wPDJbHngZaC3zF3uWNj4dQ63cnGfXpw1cESZPCqvoZE7VURyuj9kf8b"
@@ -26,6 +27,10 @@ async def exec_main():
         "type": "create_market_order",
     }
 
+    # Allocate a client order id and remember what the order was for, so acks and
+    # updates carrying it can be resolved back to this intent
+    client_order_id = client_order_ids.allocate({"symbol": "BTC", "side": "bid"})
+
     # Construct the signature payload
     signature_payload = {
         "symbol": "BTC",
@@ -33,7 +38,7 @@ async def exec_main():
         "amount": "0.1",
         "side": "bid",
         "slippage_percent": "0.5",
-        "client_order_id": str(uuid.uuid4()),
+        "client_order_id": client_order_id,
     }
 
     # Use the helper function to sign the message
@@ -71,6 +76,7 @@ async def exec_main():
         # Print details for debugging
         print("\nDebug Info:")
         print(f"Address: {public_key}")
+        print(f"Order Intent: {client_order_ids.lookup(client_order_id)}")
         print(f"Message: {message}")
         print(f"Signature: {signature}")
         print(f"WebSocket Message: {ws_message}")
@@ -1,24 +1,24 @@
 import asyncio
-import json
-
-import websockets
 
 from common.constants import WS_URL
+from common.ws_subscriptions import SubscriptionClient
 
 
 async def exec_main():
-    # Connect to WebSocket
-    async with websockets.connect(WS_URL, ping_interval=30) as websocket:
-        # Prepare the WebSocket message according to the backend format
-        ws_message = {"method": "subscribe", "params": {"source": "prices"}}
-
-        # Send the message
-        await websocket.send(json.dumps(ws_message))
-
-        # Wait for response
-        async for message in websocket:
-            data = json.loads(message)
-            print(data)
+    # Reconnects and resubscribes on its own if the connection drops
+    client = SubscriptionClient(
+        url=WS_URL,
+        on_message=print,
+        # Gaps and stalls mean messages may have been missed
+        on_event=print,
+        stall_timeout=30,
+    )
+
+    # Subscribe to the prices channel
+    await client.subscribe({"source": "prices"})
+
+    # Receive messages until interrupted
+    await client.run()
 
 
 async def main():
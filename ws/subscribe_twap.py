@@ -1,29 +1,29 @@
 import asyncio
-import json
-
-import websockets
 
 from common.constants import WS_URL
+from common.ws_subscriptions import SubscriptionClient
 
 
 async def exec_main():
-    # Connect to WebSocket
-    async with websockets.connect(WS_URL, ping_interval=30) as websocket:
-        # Prepare the WebSocket message according to the backend format
-        ws_message = {"method": "subscribe", "params": {"source": "account_twap_orders", "account": "dev1S2tC8CSZXzTQzVacYvkqWwD37dTqiCKaeJCWhwM"}}
-
-        # Send the message
-        await websocket.send(json.dumps(ws_message))
-
-        ws_message = {"method": "subscribe", "params": {"source": "account_twap_order_updates", "account": "dev1S2tC8CSZXzTQzVacYvkqWwD37dTqiCKaeJCWhwM"}}
-
-        # Send the message
-        await websocket.send(json.dumps(ws_message))
-
-        # Wait for response
-        async for message in websocket:
-            data = json.loads(message)
-            print(data)
+    # Reconnects and resubscribes on its own if the connection drops
+    client = SubscriptionClient(url=WS_URL, on_message=print, on_event=print)
+
+    # Subscribe to the account's TWAP orders and their updates
+    await client.subscribe(
+        {
+            "source": "account_twap_orders",
+            "account": "dev1S2tC8CSZXzTQzVacYvkqWwD37dTqiCKaeJCWhwM",
+        }
+    )
+    await client.subscribe(
+        {
+            "source": "account_twap_order_updates",
+            "account": "dev1S2tC8CSZXzTQzVacYvkqWwD37dTqiCKaeJCWhwM",
+        }
+    )
+
+    # Receive messages until interrupted
+    await client.run()
 
 
 async def main():
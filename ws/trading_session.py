@@ -0,0 +1,50 @@
+import asyncio
+
+from solders.keypair import Keypair
+
+from common.constants import WS_URL
+from common.order_ids import client_order_ids
+from common.ws_session import WsTradingSession
+
+PRIVATE_KEY = ""  # e.g. "2Z2Wn4kN5ZNhZzuFTQSyTiN4ixX8U6ew5wPDJbHngZaC3zF3uWNj4dQ63cnGfXpw1cESZPCqvoZE7VURyuj9kf8b"
+
+
+async def exec_main():
+    # Generate account based on private key
+    keypair = Keypair.from_base58_string(PRIVATE_KEY)
+
+    # Connect once; every request below reuses the same socket
+    async with WsTradingSession(keypair, url=WS_URL) as session:
+        # Place a few orders concurrently, replies are matched by request id
+        payloads = [
+            {
+                "symbol": "BTC",
+                "price": str(90_000 + i * 1_000),
+                "reduce_only": False,
+                "amount": "0.1",
+                "side": "bid",
+                "tif": "GTC",
+                "client_order_id": client_order_ids.allocate({"symbol": "BTC"}),
+            }
+            for i in range(3)
+        ]
+        replies = await asyncio.gather(
+            *(session.create_order(payload) for payload in payloads)
+        )
+        for reply in replies:
+            print(f"Create: {reply}")
+
+        # Cancel them again by client order id
+        for payload in payloads:
+            reply = await session.cancel_order(
+                {"symbol": "BTC", "client_order_id": payload["client_order_id"]}
+            )
+            print(f"Cancel: {reply}")
+
+
+async def main():
+    await exec_main()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())